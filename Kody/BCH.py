@@ -1,18 +1,213 @@
+import os
+import zipfile
 import galois
 import numpy as np
-from config import BCH_N, BCH_K, validate_bch_params
+from functools import lru_cache
+from config import BCH_N, BCH_K, BCH_DECODER, BCH_CACHE_DIR, validate_bch_params, validate_bch_decoder
+from ObslugaDanych.SpakowaneBity import spakuj, rozpakuj, maska_pozycji
+
+# Process-wide registry of ready-to-use codecs, keyed by (n, k, decoder)
+_CODECS = {}
+
+# Largest number of parity bits for which a syndrome table (2^(n-k) rows) is built
+MAX_LUT_PARITY_BITS = 20
+
+# Bumped whenever the layout of the cached tables changes, so stale files are not reused
+_CACHE_VERSION = 1
+
+
+@lru_cache(maxsize=None)
+def _build_galois_bch(n, k):
+    """
+    Build the galois BCH code (generator polynomial and GF(2^m) tables) once per (n, k).
+    """
+    validate_bch_params(n, k)
+    return galois.BCH(n, k)
+
+
+def _load_or_build(name, n, k, build, cache_dir=BCH_CACHE_DIR):
+    """
+    Load the arrays of a precomputed table from the on-disk cache, or build and store them.
+
+    The file is written under a temporary name and renamed into place, so processes
+    building the same table at once never read a partial file.
+
+    Args:
+        name: Table name, part of the file name
+        n, k: Code parameters
+        build: Function returning a tuple of NumPy arrays
+        cache_dir: Cache directory (None builds the table without caching)
+
+    Returns:
+        Tuple of NumPy arrays
+    """
+    if cache_dir is None:
+        return build()
+    path = os.path.join(cache_dir, f"{name}_{n}_{k}_v{_CACHE_VERSION}.npz")
+    try:
+        with np.load(path) as cached:
+            return tuple(cached[f"arr_{i}"] for i in range(len(cached.files)))
+    except (OSError, ValueError, KeyError, EOFError, zipfile.BadZipFile):
+        # Missing, truncated or otherwise unreadable file - rebuild it
+        pass
+    arrays = build()
+    os.makedirs(cache_dir, exist_ok=True)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as file:
+        np.savez(file, *arrays)
+    os.replace(temporary, path)
+    return arrays
+
+
+@lru_cache(maxsize=None)
+def _load_generator_matrix(n, k):
+    """
+    Binary (k x n) generator matrix of BCH(n, k), from the disk cache when available.
+    """
+    validate_bch_params(n, k)
+    generator_matrix, = _load_or_build(
+        "generator", n, k, lambda: (_build_galois_bch(n, k).G.view(np.ndarray).astype(np.uint8),))
+    return generator_matrix
+
+
+@lru_cache(maxsize=None)
+def _parity_check_transpose(n, k):
+    """
+    Binary (n x n-k) transposed parity-check matrix of BCH(n, k) and the weights that turn
+    a syndrome into a table index, shared by the syndrome table and the packed tables.
+    """
+    parity = _load_generator_matrix(n, k)[:, k:]
+    # Systematic G = [I | P] gives H = [P^T | I], so H^T stacks P on top of I
+    parity_check_t = np.vstack([parity, np.eye(n - k, dtype=np.uint8)])
+    syndrome_weights = (1 << np.arange(n - k - 1, -1, -1)).astype(np.int64)
+    return parity_check_t, syndrome_weights
+
+
+@lru_cache(maxsize=None)
+def _build_syndrome_table(n, k):
+    """
+    Build the syndrome -> correction pattern table for a BCH(n, k) code once per (n, k).
+
+    Every syndrome is decoded with the galois decoder on its coset representative
+    (the syndrome bits placed in the parity positions), so the table reproduces the
+    galois output exactly, including miscorrections and decoder failures.
+
+    The correction table is stored in the on-disk cache, so it is computed once per machine.
+
+    Returns:
+        Tuple (parity_check_t, syndrome_weights, corrections) where parity_check_t is the
+        (n, n-k) binary transposed parity-check matrix, syndrome_weights maps syndrome
+        bits to a table index and corrections is a (2^(n-k), n) uint8 table
+    """
+    if n - k > MAX_LUT_PARITY_BITS:
+        raise ValueError(f"Syndrome table for BCH({n}, {k}) would need 2^{n - k} entries")
+    parity_check_t, syndrome_weights = _parity_check_transpose(n, k)
+
+    def build_corrections():
+        code = _build_galois_bch(n, k)
+        syndromes = np.arange(1 << (n - k), dtype=np.int64)
+        representatives = np.zeros((len(syndromes), n), dtype=np.uint8)
+        representatives[:, k:] = (syndromes[:, None] >> np.arange(n - k - 1, -1, -1)) & 1
+        decoded = code.decode(code.field(representatives), output="codeword")
+        return (representatives ^ decoded.view(np.ndarray).astype(np.uint8),)
+
+    corrections, = _load_or_build("syndromes", n, k, build_corrections)
+    return parity_check_t, syndrome_weights, corrections
+
+
+def _byte_xor_tables(matrix):
+    """
+    For a binary (r x c) matrix build per-byte XOR tables: entry [j, v] is the GF(2) sum of
+    the rows 8j..8j+7 selected by the bits of v (least significant bit first).
+
+    Returns:
+        uint8 array of shape (ceil(r / 8), 256, c)
+    """
+    rows, columns = matrix.shape
+    padded = np.zeros((-(-rows // 8) * 8, columns), dtype=np.int32)
+    padded[:rows] = matrix
+    byte_bits = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1, bitorder='little').astype(np.int32)
+    return np.stack([(byte_bits @ padded[8 * j:8 * j + 8]) & 1 for j in range(len(padded) // 8)]).astype(np.uint8)
+
+
+@lru_cache(maxsize=None)
+def _build_packed_tables(n, k):
+    """
+    Tables for the bit-packed (uint64 word) encoder and syndrome computation.
+
+    Encoding is the XOR of generator rows selected by the message bits, done one message
+    byte at a time; the syndrome is computed the same way from the transposed parity-check
+    matrix and kept as a table index, since syndromes of XORed words XOR as well.
+
+    Returns:
+        Tuple (encode_tables, syndrome_tables) of shapes (ceil(k/8), 256, ceil(n/64)) uint64
+        and (ceil(n/8), 256) int64
+    """
+    generator_matrix = _load_generator_matrix(n, k)
+    encode_tables = spakuj(_byte_xor_tables(generator_matrix))
+    parity_check_t, syndrome_weights = _parity_check_transpose(n, k)
+    syndrome_tables = _byte_xor_tables(parity_check_t).astype(np.int64) @ syndrome_weights
+    return encode_tables, syndrome_tables
+
+
+def _packed_bytes(words, count):
+    """
+    First count bytes (little-endian) of every row of a (N, W) uint64 array.
+    """
+    return np.ascontiguousarray(words, dtype='<u8').view(np.uint8)[:, :count]
+
+
+def get_codec(n=BCH_N, k=BCH_K, decoder=BCH_DECODER):
+    """
+    Return the shared BCH codec for the given parameters, building it on first use.
+
+    Args:
+        n: Codeword length (defaults to BCH_N from config.py)
+        k: Message length (defaults to BCH_K from config.py)
+        decoder: Decoding engine, "galois" or "lut" (defaults to BCH_DECODER from config.py)
+
+    Returns:
+        BCH instance shared by every caller in this process
+    """
+    key = (n, k, decoder)
+    if key not in _CODECS:
+        _CODECS[key] = BCH(n, k, decoder)
+    return _CODECS[key]
+
 
 class BCH:
-    def __init__(self):
+    def __init__(self, n=None, k=None, decoder=None):
         """
-        Initialize a BCH code with parameters from config.py
+        Initialize a BCH code, by default with parameters from config.py.
+        The generator matrix and syndrome table are loaded from the on-disk cache
+        (BCH_CACHE_DIR) and the galois code is only built when first needed, so with
+        decoder="lut" the batched path never builds it. With decoder="lut" decoding is
+        a syndrome table lookup instead of the galois Berlekamp-Massey/Chien search.
         """
-        validate_bch_params()
-        self.n = BCH_N
-        self.k = BCH_K
-        self.bch = galois.BCH(self.n, self.k)
-        self.field = self.bch.field
-        
+        self.n = BCH_N if n is None else n
+        self.k = BCH_K if k is None else k
+        self.decoder = BCH_DECODER if decoder is None else decoder
+        validate_bch_params(self.n, self.k)
+        validate_bch_decoder(self.decoder)
+        # Binary generator matrix (k x n) used by the batched encoder
+        self.generator_matrix = _load_generator_matrix(self.n, self.k)
+        if self.decoder == "lut":
+            self.parity_check_t, self.syndrome_weights, self.corrections = _build_syndrome_table(self.n, self.k)
+            self.packed_corrections = spakuj(self.corrections)
+
+    @property
+    def bch(self):
+        """The galois BCH code, shared by all codecs with the same (n, k)."""
+        return _build_galois_bch(self.n, self.k)
+
+    @property
+    def field(self):
+        return self.bch.field
+
+    @property
+    def generator_poly(self):
+        return self.bch.generator_poly
+
     def koduj(self, message):
         """
         Encode a message using BCH code.
@@ -46,10 +241,109 @@ class BCH:
         if len(received) != self.n:
             raise ValueError(f"Received message length must be {self.n} bits")
             
+        if self.decoder == "lut":
+            return self.dekoduj_batch([received])[0].tolist()
+
         # Convert received message to GF array
         received_gf = self.field(received)
         # Decode with error count
         decoded, _ = self.bch.decode(received_gf, errors=True)
         # Convert back to regular list
         return decoded.tolist()
-        
\ No newline at end of file
+
+    def koduj_batch(self, messages):
+        """
+        Encode a block of messages at once using BCH code.
+
+        Args:
+            messages: NumPy array of shape (N, k) with one message per row
+
+        Returns:
+            Encoded messages as a uint8 array of shape (N, n)
+        """
+        messages = np.asarray(messages, dtype=np.uint8)
+        if messages.ndim != 2 or messages.shape[1] != self.k:
+            raise ValueError(f"Messages must be an array of shape (N, {self.k})")
+
+        # Systematic encoding is a GF(2) product with the generator matrix
+        encoded = messages.astype(np.int32) @ self.generator_matrix
+        return (encoded & 1).astype(np.uint8)
+
+    def dekoduj_batch(self, received):
+        """
+        Decode a block of received codewords at once using BCH code.
+
+        Args:
+            received: NumPy array of shape (N, n) with one codeword per row
+
+        Returns:
+            Decoded messages as a uint8 array of shape (N, k)
+        """
+        received = np.asarray(received, dtype=np.uint8)
+        if received.ndim != 2 or received.shape[1] != self.n:
+            raise ValueError(f"Received block must be an array of shape (N, {self.n})")
+
+        if self.decoder == "lut":
+            return self._dekoduj_lut(received)
+
+        decoded = self.bch.decode(self.field(received))
+        return decoded.view(np.ndarray).astype(np.uint8)
+
+    def koduj_spakowane(self, messages):
+        """
+        Encode bit-packed messages (ObslugaDanych.SpakowaneBity format) without unpacking them.
+        Every codeword occupies its own row of ceil(n/64) words, so a short code such as
+        BCH(15, 5) uses 15 of 64 bits and takes 8 bytes instead of n bytes unpacked.
+
+        Args:
+            messages: uint64 array of shape (N, ceil(k/64)) with one message per row
+
+        Returns:
+            Encoded codewords as a uint64 array of shape (N, ceil(n/64))
+        """
+        messages = np.asarray(messages, dtype=np.uint64)
+        if messages.ndim != 2 or messages.shape[1] != -(-self.k // 64):
+            raise ValueError(f"Packed messages must be an array of shape (N, {-(-self.k // 64)})")
+        encode_tables, _ = _build_packed_tables(self.n, self.k)
+        message_bytes = _packed_bytes(messages, len(encode_tables))
+        encoded = np.zeros((len(messages), encode_tables.shape[-1]), dtype=np.uint64)
+        for j, table in enumerate(encode_tables):
+            encoded ^= table[message_bytes[:, j]]
+        return encoded
+
+    def dekoduj_spakowane(self, received):
+        """
+        Decode bit-packed codewords (ObslugaDanych.SpakowaneBity format).
+        With the "lut" decoder syndromes and corrections are computed on the packed words;
+        the galois decoder unpacks the block, decodes it and packs the result.
+
+        Args:
+            received: uint64 array of shape (N, ceil(n/64)) with one codeword per row
+
+        Returns:
+            Decoded messages as a uint64 array of shape (N, ceil(k/64))
+        """
+        received = np.asarray(received, dtype=np.uint64)
+        if received.ndim != 2 or received.shape[1] != -(-self.n // 64):
+            raise ValueError(f"Packed block must be an array of shape (N, {-(-self.n // 64)})")
+        if self.decoder != "lut":
+            return spakuj(self.dekoduj_batch(rozpakuj(received, self.n)))
+
+        _, syndrome_tables = _build_packed_tables(self.n, self.k)
+        received_bytes = _packed_bytes(received, len(syndrome_tables))
+        syndromes = np.zeros(len(received), dtype=np.int64)
+        for j, table in enumerate(syndrome_tables):
+            syndromes ^= table[received_bytes[:, j]]
+        corrected = received ^ self.packed_corrections[syndromes]
+        # Systematic code: the message occupies the first k bits
+        message_words = -(-self.k // 64)
+        return corrected[:, :message_words] & maska_pozycji(self.k)
+
+    def _dekoduj_lut(self, received):
+        """
+        Decode a (N, n) block by syndrome table lookup.
+        """
+        syndromes = (received.astype(np.int64) @ self.parity_check_t) & 1
+        corrected = received ^ self.corrections[syndromes @ self.syndrome_weights]
+        # Systematic code: the message occupies the first k positions
+        return corrected[:, :self.k]
@@ -1,5 +1,9 @@
+import os
+import tempfile
 import unittest
-from BCH import BCH
+import numpy as np
+from BCH import BCH, get_codec, _load_or_build
+from ObslugaDanych.SpakowaneBity import spakuj, rozpakuj
 
 class TestBCH(unittest.TestCase):
     def setUp(self):
@@ -68,5 +72,99 @@ class TestBCH(unittest.TestCase):
         with self.assertRaises(ValueError):
             self.bch.dekoduj(received)
 
+    def test_shared_codec(self):
+        """Test that the codec registry returns one instance per (n, k)."""
+        codec = get_codec(15, 5)
+        self.assertIs(codec, get_codec(15, 5))
+        self.assertIs(codec.bch, self.bch.bch)  # galois code is built only once
+
+    def test_batch_matches_single(self):
+        """Test that batched encode/decode agrees with the per-message API."""
+        messages = np.array([[1, 0, 1, 1, 0], [0, 1, 1, 0, 1], [1, 1, 1, 1, 1]], dtype=np.uint8)
+        encoded = self.bch.koduj_batch(messages)
+        self.assertEqual(encoded.shape, (3, 15))
+        for message, codeword in zip(messages, encoded):
+            self.assertEqual(codeword.tolist(), self.bch.koduj(message.tolist()))
+        encoded[0, 4] ^= 1
+        encoded[1, [2, 7, 12, 14]] ^= 1
+        decoded = self.bch.dekoduj_batch(encoded)
+        for received, message in zip(encoded, decoded):
+            self.assertEqual(message.tolist(), self.bch.dekoduj(received.tolist()))
+
+    def test_invalid_batch_shape(self):
+        """Test handling of a batch with the wrong number of columns."""
+        with self.assertRaises(ValueError):
+            self.bch.koduj_batch(np.zeros((2, 4), dtype=np.uint8))
+        with self.assertRaises(ValueError):
+            self.bch.dekoduj_batch(np.zeros((2, 14), dtype=np.uint8))
+
+    def test_packed_matches_batch(self):
+        """Test that encode/decode on packed uint64 words agrees with the unpacked batch API."""
+        generator = np.random.default_rng(0)
+        messages = generator.integers(0, 2, (200, 5), dtype=np.uint8)
+        encoded = self.bch.koduj_batch(messages)
+        np.testing.assert_array_equal(rozpakuj(self.bch.koduj_spakowane(spakuj(messages)), 15), encoded)
+        received = encoded ^ (generator.random(encoded.shape) < 0.15).astype(np.uint8)
+        np.testing.assert_array_equal(rozpakuj(self.bch.dekoduj_spakowane(spakuj(received)), 5),
+                                      self.bch.dekoduj_batch(received))
+
+    def test_other_code_parameters(self):
+        """Test a longer code, BCH(31, 16), which corrects 3 errors."""
+        bch = get_codec(31, 16)
+        message = [1, 0] * 8
+        encoded = bch.koduj(message)
+        self.assertEqual(len(encoded), 31)
+        for position in (0, 15, 30):
+            encoded[position] ^= 1
+        self.assertEqual(bch.dekoduj(encoded), message)
+
+    def test_table_disk_cache(self):
+        """Test that a table is built once and then loaded from the disk cache."""
+        calls = []
+        def build():
+            calls.append(1)
+            return (self.bch.generator_matrix,)
+        with tempfile.TemporaryDirectory() as cache_dir:
+            first, = _load_or_build("generator", 15, 5, build, cache_dir)
+            second, = _load_or_build("generator", 15, 5, build, cache_dir)
+            self.assertEqual(os.listdir(cache_dir), ["generator_15_5_v1.npz"])
+        self.assertEqual(len(calls), 1)
+        np.testing.assert_array_equal(first, second)
+
+    def test_corrupted_cache_file_rebuilt(self):
+        """Test that a truncated cache file is rebuilt instead of failing the run."""
+        calls = []
+        def build():
+            calls.append(1)
+            return (self.bch.generator_matrix,)
+        with tempfile.TemporaryDirectory() as cache_dir:
+            _load_or_build("generator", 15, 5, build, cache_dir)
+            path = os.path.join(cache_dir, "generator_15_5_v1.npz")
+            with open(path, "rb") as file:
+                contents = file.read()
+            with open(path, "wb") as file:
+                file.write(contents[:len(contents) // 2])
+            rebuilt, = _load_or_build("generator", 15, 5, build, cache_dir)
+            loaded, = _load_or_build("generator", 15, 5, build, cache_dir)
+        self.assertEqual(len(calls), 2)
+        np.testing.assert_array_equal(rebuilt, self.bch.generator_matrix)
+        np.testing.assert_array_equal(loaded, self.bch.generator_matrix)
+
+class TestBCHLookup(TestBCH):
+    """Run the same checks against the syndrome table decoder."""
+    def setUp(self):
+        self.bch = BCH(n=15, k=5, decoder="lut")
+
+    def test_agrees_with_galois_decoder(self):
+        """Test that the table decoder matches galois on every possible received word."""
+        received = (np.arange(1 << 15)[:, None] >> np.arange(14, -1, -1)) & 1
+        reference = BCH(n=15, k=5, decoder="galois").dekoduj_batch(received)
+        np.testing.assert_array_equal(self.bch.dekoduj_batch(received), reference)
+
+    def test_invalid_decoder(self):
+        """Test handling of an unknown decoding engine."""
+        with self.assertRaises(ValueError):
+            BCH(n=15, k=5, decoder="chien")
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
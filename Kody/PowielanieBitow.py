@@ -1,3 +1,5 @@
+import numpy as np
+
 class PowielanieBitow:
     """
     Klasa implementująca metodę powielania bitów jako prostą technikę wykrywania i korekcji błędów.
@@ -23,6 +25,7 @@ class PowielanieBitow:
     def dekoduj(self, dane):
         """
         Dekoduje dane przez zliczanie większości w powtórzeniach bitów.
+        Przy remisie (parzysta liczba powtórzeń, tyle samo zer co jedynek) wynikiem jest 0.
         Argumenty:
         - dane: Lista bitów odebranych.
         Zwraca:
@@ -33,3 +36,29 @@ class PowielanieBitow:
             fragment = dane[i:i + self.liczba_powtorzen]
             odkodowane.append(1 if fragment.count(1) > fragment.count(0) else 0)
         return odkodowane
+
+    def koduj_tablice(self, dane):
+        """
+        Koduje całą macierz wiadomości naraz przez powielenie każdego bitu.
+        Argumenty:
+        - dane: Tablica NumPy bitów o kształcie (N, L) lub (L,).
+        Zwraca:
+        - Tablica uint8 o kształcie (N, L * liczba_powtorzen) lub (L * liczba_powtorzen,).
+        """
+        return np.repeat(np.asarray(dane, dtype=np.uint8), self.liczba_powtorzen, axis=-1)
+
+    def dekoduj_tablice(self, dane):
+        """
+        Dekoduje całą macierz naraz: grupy powtórzeń są sumowane wierszowo i porównywane z progiem większości.
+        Przy remisie (parzysta liczba powtórzeń) wynikiem jest 0, tak jak w dekoduj, bo bit jest
+        jedynką tylko, gdy 2 * suma > liczba_powtorzen; remis psuje więc tylko nadane jedynki.
+        Argumenty:
+        - dane: Tablica NumPy bitów o kształcie (N, L * liczba_powtorzen) lub (L * liczba_powtorzen,).
+        Zwraca:
+        - Tablica uint8 o kształcie (N, L) lub (L,).
+        """
+        dane = np.asarray(dane, dtype=np.uint8)
+        if dane.shape[-1] % self.liczba_powtorzen != 0:
+            raise ValueError("Długość danych musi być wielokrotnością liczby powtórzeń")
+        grupy = dane.reshape(dane.shape[:-1] + (-1, self.liczba_powtorzen))
+        return (2 * grupy.sum(axis=-1, dtype=np.int32) > self.liczba_powtorzen).astype(np.uint8)
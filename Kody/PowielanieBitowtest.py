@@ -0,0 +1,49 @@
+import unittest
+import numpy as np
+from PowielanieBitow import PowielanieBitow
+
+class TestPowielanieBitow(unittest.TestCase):
+    def setUp(self):
+        self.generator = np.random.default_rng(0)
+
+    def test_array_encoding_matches_list(self):
+        """Test that the array encoder repeats bits exactly like the list-based one."""
+        for powtorzenia in (1, 3, 4):
+            powielanie = PowielanieBitow(powtorzenia)
+            dane = self.generator.integers(0, 2, (20, 13), dtype=np.uint8)
+            zakodowane = powielanie.koduj_tablice(dane)
+            self.assertEqual(zakodowane.shape, (20, 13 * powtorzenia))
+            for wiersz, zakodowany in zip(dane, zakodowane):
+                self.assertEqual(zakodowany.tolist(), powielanie.koduj(wiersz.tolist()))
+            np.testing.assert_array_equal(powielanie.koduj_tablice(dane[0]), zakodowane[0])
+
+    def test_array_decoding_matches_list(self):
+        """Test that majority decoding of arrays agrees with the list-based decoder on noisy input."""
+        for powtorzenia in (1, 2, 3, 5):
+            powielanie = PowielanieBitow(powtorzenia)
+            odebrane = self.generator.integers(0, 2, (50, 11 * powtorzenia), dtype=np.uint8)
+            odkodowane = powielanie.dekoduj_tablice(odebrane)
+            self.assertEqual(odkodowane.shape, (50, 11))
+            for wiersz, odkodowany in zip(odebrane, odkodowane):
+                self.assertEqual(odkodowany.tolist(), powielanie.dekoduj(wiersz.tolist()))
+
+    def test_even_repetition_tie_decodes_to_zero(self):
+        """Test that a tie with an even number of repetitions decodes to 0 in both decoders."""
+        powielanie = PowielanieBitow(4)
+        odebrane = [1, 1, 0, 0, 0, 1, 0, 1, 1, 1, 1, 0]
+        self.assertEqual(powielanie.dekoduj(odebrane), [0, 0, 1])
+        np.testing.assert_array_equal(powielanie.dekoduj_tablice(odebrane), [0, 0, 1])
+
+    def test_round_trip_without_errors(self):
+        """Test that encoding and decoding without channel errors returns the message."""
+        powielanie = PowielanieBitow(3)
+        dane = self.generator.integers(0, 2, (10, 30), dtype=np.uint8)
+        np.testing.assert_array_equal(powielanie.dekoduj_tablice(powielanie.koduj_tablice(dane)), dane)
+
+    def test_invalid_length(self):
+        """Test that decoding rejects data whose length is not a multiple of the repetition count."""
+        with self.assertRaises(ValueError):
+            PowielanieBitow(3).dekoduj_tablice(np.zeros((2, 10), dtype=np.uint8))
+
+if __name__ == '__main__':
+    unittest.main()
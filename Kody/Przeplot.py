@@ -0,0 +1,104 @@
+import numpy as np
+
+
+class Przeplot:
+    """
+    Przeplot słów kodowych opisany stałymi tablicami indeksów.
+    Słowa kodowe są grupowane w ramki po liczba_slow słów, a każda ramka jest permutowana
+    jednym indeksowaniem NumPy, więc przeplot nic nie kosztuje poza kopią danych.
+    Parametry:
+    - liczba_slow: Liczba słów kodowych w jednej ramce.
+    - dlugosc_slowa: Długość słowa kodowego w bitach.
+    - indeksy: Dla każdej pozycji ramki wyjściowej indeks bitu ramki wejściowej
+      (indeks liczba_slow * dlugosc_slowa oznacza bit wypełnienia równy 0).
+    """
+    def __init__(self, liczba_slow, dlugosc_slowa, indeksy):
+        self.liczba_slow = liczba_slow
+        self.dlugosc_slowa = dlugosc_slowa
+        self.dlugosc_ramki = liczba_slow * dlugosc_slowa
+        self.indeksy = np.asarray(indeksy, dtype=np.intp)
+        # Pozycja w ramce wyjściowej każdego bitu ramki wejściowej
+        wypelnione = self.indeksy < self.dlugosc_ramki
+        self.pozycje = np.empty(self.dlugosc_ramki, dtype=np.intp)
+        self.pozycje[self.indeksy[wypelnione]] = np.flatnonzero(wypelnione)
+
+    def przeplataj(self, slowa):
+        """
+        Przeplata słowa kodowe ramka po ramce.
+        Argumenty:
+        - slowa: Tablica NumPy o kształcie (N, dlugosc_slowa); ostatnia ramka dopełniana jest słowami zerowymi.
+        Zwraca:
+        - Tablica uint8 (liczba ramek, len(indeksy)) z przeplecionymi ramkami.
+        """
+        slowa = np.asarray(slowa, dtype=np.uint8)
+        if slowa.ndim != 2 or slowa.shape[1] != self.dlugosc_slowa:
+            raise ValueError(f"Oczekiwano słów o długości {self.dlugosc_slowa}, otrzymano kształt {slowa.shape}")
+        liczba_ramek = -(-len(slowa) // self.liczba_slow)
+        ramki = np.zeros((liczba_ramek * self.liczba_slow, self.dlugosc_slowa), dtype=np.uint8)
+        ramki[:len(slowa)] = slowa
+        # Dodatkowa ostatnia kolumna to bit wypełnienia
+        ramki = np.concatenate([ramki.reshape(liczba_ramek, -1), np.zeros((liczba_ramek, 1), dtype=np.uint8)], axis=1)
+        return ramki[:, self.indeksy]
+
+    def rozplataj(self, ramki, liczba_slow):
+        """
+        Odwraca przeplot i usuwa słowa dopełnienia.
+        Argumenty:
+        - ramki: Tablica NumPy (liczba ramek, len(indeksy)) odebrana z kanału.
+        - liczba_slow: Liczba słów kodowych przed przeplotem.
+        Zwraca:
+        - Tablica uint8 (liczba_slow, dlugosc_slowa).
+        """
+        ramki = np.asarray(ramki, dtype=np.uint8)
+        return ramki[:, self.pozycje].reshape(-1, self.dlugosc_slowa)[:liczba_slow]
+
+
+class PrzeplotBlokowy(Przeplot):
+    """
+    Przeplot blokowy: glebokosc słów kodowych zapisywanych wierszami i wysyłanych kolumnami.
+    Paczka błędów krótsza niż glebokosc bitów trafia w każde słowo co najwyżej raz.
+    """
+    def __init__(self, glebokosc, dlugosc_slowa):
+        if glebokosc < 1:
+            raise ValueError("Głębokość przeplotu musi być dodatnia.")
+        indeksy = np.arange(glebokosc * dlugosc_slowa).reshape(glebokosc, dlugosc_slowa).T.reshape(-1)
+        super().__init__(glebokosc, dlugosc_slowa, indeksy)
+
+
+class PrzeplotSplotowy(Przeplot):
+    """
+    Przeplot splotowy (Forneya) o liczba_galezi gałęziach: bit i trafia do gałęzi i mod liczba_galezi
+    i jest opóźniany o (i mod liczba_galezi) * opoznienie pozycji w gałęzi. Ramka jest dopełniana
+    bitami zerowymi, które opróżniają linie opóźniające.
+    Parametry:
+    - liczba_galezi: Liczba gałęzi przeplotu.
+    - opoznienie: Przyrost opóźnienia między kolejnymi gałęziami (w słowach gałęzi).
+    - dlugosc_slowa: Długość słowa kodowego w bitach.
+    - liczba_slow: Liczba słów kodowych w ramce (domyślnie liczba_galezi).
+    """
+    def __init__(self, liczba_galezi, opoznienie, dlugosc_slowa, liczba_slow=None):
+        if liczba_galezi < 1 or opoznienie < 0:
+            raise ValueError("Liczba gałęzi musi być dodatnia, a opóźnienie nieujemne.")
+        if liczba_slow is None:
+            liczba_slow = liczba_galezi
+        dlugosc_ramki = liczba_slow * dlugosc_slowa
+        wejscie = np.arange(dlugosc_ramki)
+        galaz = wejscie % liczba_galezi
+        wyjscie = wejscie + galaz * liczba_galezi * opoznienie
+        dlugosc_wyjscia = liczba_galezi * (-(-dlugosc_ramki // liczba_galezi) + (liczba_galezi - 1) * opoznienie)
+        indeksy = np.full(dlugosc_wyjscia, dlugosc_ramki, dtype=np.intp)
+        indeksy[wyjscie] = wejscie
+        super().__init__(liczba_slow, dlugosc_slowa, indeksy)
+
+
+def utworz_przeplot(opis, dlugosc_slowa):
+    """
+    Tworzy przeplot z opisu w postaci krotki: ('blokowy', glebokosc) lub
+    ('splotowy', liczba_galezi, opoznienie).
+    """
+    rodzaj, *parametry = opis
+    if rodzaj == 'blokowy':
+        return PrzeplotBlokowy(*parametry, dlugosc_slowa)
+    if rodzaj == 'splotowy':
+        return PrzeplotSplotowy(*parametry, dlugosc_slowa)
+    raise ValueError(f"Nieznany rodzaj przeplotu: {rodzaj}")
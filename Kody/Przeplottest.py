@@ -0,0 +1,28 @@
+import unittest
+import numpy as np
+from Przeplot import PrzeplotBlokowy, PrzeplotSplotowy, utworz_przeplot
+
+class TestPrzeplot(unittest.TestCase):
+    def setUp(self):
+        self.slowa = np.random.default_rng(0).integers(0, 2, (23, 15), dtype=np.uint8)
+
+    def test_round_trip(self):
+        """Test that deinterleaving restores the codewords."""
+        for przeplot in (PrzeplotBlokowy(1, 15), PrzeplotBlokowy(4, 15), PrzeplotSplotowy(5, 2, 15)):
+            ramki = przeplot.przeplataj(self.slowa)
+            np.testing.assert_array_equal(przeplot.rozplataj(ramki, len(self.slowa)), self.slowa)
+
+    def test_block_spreads_burst(self):
+        """Test that a burst of depth bits hits every codeword of a frame once."""
+        przeplot = PrzeplotBlokowy(4, 15)
+        bledy = np.zeros((1, 60), dtype=np.uint8)
+        bledy[0, 10:14] = 1
+        np.testing.assert_array_equal(przeplot.rozplataj(bledy, 4).sum(axis=1), [1, 1, 1, 1])
+
+    def test_invalid_description(self):
+        """Test that an unknown interleaver raises ValueError."""
+        with self.assertRaises(ValueError):
+            utworz_przeplot(('spiralny', 3), 15)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,10 +1,71 @@
+import numpy as np
+
+# Liczba jedynek w każdej wartości bajtu (popcount), gdy NumPy nie ma np.bitwise_count
+_JEDYNKI_W_BAJCIE = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1).astype(np.uint8)
+
+
+def _popcount(tablica):
+    """
+    Liczy ustawione bity w każdym elemencie tablicy liczb całkowitych bez znaku.
+    """
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(tablica)
+    bajty = tablica.view(np.uint8).reshape(tablica.shape + (tablica.dtype.itemsize,))
+    return _JEDYNKI_W_BAJCIE[bajty].sum(axis=-1)
+
+
+def zlicz_bledy_wierszami(dane_wejsciowe, dane_odebrane):
+    """
+    Liczy błędy w każdym wierszu dwóch macierzy bitów (jedna wiadomość w wierszu).
+    :param dane_wejsciowe: Tablica bitów o kształcie (N, L) lub (L,)
+    :param dane_odebrane: Tablica bitów tego samego kształtu
+    :return: Tablica int64 z liczbą błędów w każdym wierszu (lub liczba dla danych 1D)
+    """
+    dane_wejsciowe = np.asarray(dane_wejsciowe)
+    dane_odebrane = np.asarray(dane_odebrane)
+    if dane_wejsciowe.shape != dane_odebrane.shape:
+        raise ValueError("Długość danych wejściowych i odebranych musi być taka sama.")
+    return np.count_nonzero(dane_wejsciowe != dane_odebrane, axis=-1)
+
+
+def zlicz_bledy_spakowane(dane_wejsciowe, dane_odebrane):
+    """
+    Liczy błędy w każdym wierszu danych spakowanych bitowo (np. np.packbits lub słowa uint64)
+    jako popcount z XOR obu tablic.
+    :param dane_wejsciowe: Tablica liczb całkowitych bez znaku o kształcie (N, W) lub (W,)
+    :param dane_odebrane: Tablica tego samego kształtu i typu
+    :return: Tablica int64 z liczbą błędów w każdym wierszu (lub liczba dla danych 1D)
+    """
+    dane_wejsciowe = np.asarray(dane_wejsciowe)
+    dane_odebrane = np.asarray(dane_odebrane)
+    if dane_wejsciowe.shape != dane_odebrane.shape:
+        raise ValueError("Długość danych wejściowych i odebranych musi być taka sama.")
+    return _popcount(dane_wejsciowe ^ dane_odebrane).sum(axis=-1, dtype=np.int64)
+
+
+def rozklad_bledow(liczby_bledow):
+    """
+    Buduje rozkład liczby błędów na wiadomość.
+    :param liczby_bledow: Tablica z liczbą błędów w każdej wiadomości
+    :return: Słownik {liczba błędów: liczba wiadomości}, tylko dla występujących liczb błędów
+    """
+    zliczenia = np.bincount(np.asarray(liczby_bledow, dtype=np.int64).ravel())
+    wystepujace = np.flatnonzero(zliczenia)
+    return dict(zip(wystepujace.tolist(), zliczenia[wystepujace].tolist()))
+
+
+def _na_bity(dane):
+    # Ciąg znaków lub lista bitów -> tablica liczb, element po elemencie ("0101" -> [0, 1, 0, 1])
+    return np.fromiter(map(int, dane), dtype=np.int64, count=len(dane))
+
+
 def zlicz_bledyPowielanie(dane_poczatkowe, dane_koncowe):
 
     # Dopasowanie długości do krótszej listy
     dlugosc = min(len(dane_poczatkowe), len(dane_koncowe))
 
     # Zliczanie różnic w bitach
-    liczba_roznic = sum(1 for i in range(dlugosc) if dane_poczatkowe[i] != dane_koncowe[i])
+    liczba_roznic = int(zlicz_bledy_wierszami(_na_bity(dane_poczatkowe[:dlugosc]), _na_bity(dane_koncowe[:dlugosc])))
 
     # Dodanie różnic wynikających z nadmiarowych bitów (jeśli długości się różnią)
     liczba_roznic += abs(len(dane_poczatkowe) - len(dane_koncowe))
@@ -29,7 +90,7 @@ def zlicz_bledy_bch(dane_wejsciowe, dane_odebrane):
         raise ValueError("Długość danych wejściowych i odebranych musi być taka sama.")
 
     # Zliczanie błędów
-    return sum(1 for a, b in zip(dane_wejsciowe, dane_odebrane) if a != b)
+    return int(zlicz_bledy_wierszami(_na_bity(dane_wejsciowe), _na_bity(dane_odebrane)))
 
 def zlicz_bledy_LDPC(dane_wejsciowe, dane_odebrane):
     """
@@ -38,4 +99,5 @@ def zlicz_bledy_LDPC(dane_wejsciowe, dane_odebrane):
     :param dane_odebrane: Odkodowane dane wyjściowe.
     :return: Liczba błędów.
     """
-    return sum(1 for a, b in zip(dane_wejsciowe, dane_odebrane) if a != b)
\ No newline at end of file
+    dlugosc = min(len(dane_wejsciowe), len(dane_odebrane))
+    return int(zlicz_bledy_wierszami(_na_bity(dane_wejsciowe[:dlugosc]), _na_bity(dane_odebrane[:dlugosc])))
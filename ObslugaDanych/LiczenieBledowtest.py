@@ -0,0 +1,35 @@
+import unittest
+import numpy as np
+from LiczenieBledow import (zlicz_bledy_wierszami, zlicz_bledy_spakowane, rozklad_bledow,
+                            zlicz_bledyPowielanie, zlicz_bledy_bch, zlicz_bledy_LDPC)
+
+class TestLiczenieBledow(unittest.TestCase):
+    def test_string_input(self):
+        """Test that strings are compared bit by bit, like lists."""
+        self.assertEqual(zlicz_bledyPowielanie('0101', '0110'), 2)
+        self.assertEqual(zlicz_bledy_LDPC('0101', '0110'), 2)
+        self.assertEqual(zlicz_bledy_bch('0101', '0110'), 2)
+        self.assertEqual(zlicz_bledyPowielanie('0101', [0, 1, 1, 0]), 2)
+        self.assertEqual(zlicz_bledy_LDPC([0, 1, 0, 1], '0110'), 2)
+
+    def test_length_mismatch(self):
+        """Test that the extra bits count as errors in repetition and are ignored in LDPC."""
+        self.assertEqual(zlicz_bledyPowielanie('0101', '01'), 2)
+        self.assertEqual(zlicz_bledy_LDPC('0101', '01'), 0)
+        with self.assertRaises(ValueError):
+            zlicz_bledy_bch('0101', '01')
+
+    def test_packed_matches_unpacked(self):
+        """Test that packed counting gives the same per-row errors as bit counting."""
+        rng = np.random.default_rng(0)
+        a = rng.integers(0, 2, (10, 70), dtype=np.uint8)
+        b = rng.integers(0, 2, (10, 70), dtype=np.uint8)
+        np.testing.assert_array_equal(zlicz_bledy_spakowane(np.packbits(a, axis=1), np.packbits(b, axis=1)),
+                                      zlicz_bledy_wierszami(a, b))
+
+    def test_distribution(self):
+        """Test that the distribution lists only the occurring error counts."""
+        self.assertEqual(rozklad_bledow([0, 2, 2, 5]), {0: 1, 2: 2, 5: 1})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+import hashlib
+import json
+import sqlite3
+
+# Numer jednostki zapisywanej dla całego prawdopodobieństwa błędu (tryby bez podziału na fragmenty)
+CALY_PUNKT = -1
+
+_SCHEMAT = """
+CREATE TABLE IF NOT EXISTS przebiegi (
+    id_przebiegu TEXT PRIMARY KEY,
+    konfiguracja TEXT NOT NULL,
+    ziarno TEXT
+);
+CREATE TABLE IF NOT EXISTS jednostki (
+    id_przebiegu TEXT NOT NULL REFERENCES przebiegi(id_przebiegu),
+    prawd_bledu REAL NOT NULL,
+    fragment INTEGER NOT NULL,
+    wynik TEXT NOT NULL,
+    PRIMARY KEY (id_przebiegu, prawd_bledu, fragment)
+);
+"""
+
+
+def klucze_liczbowe(slownik):
+    """
+    object_hook dla json.load(s): JSON zamienia klucze int (liczby błędów w rozkładach) na tekst,
+    a ta funkcja przywraca je jako int. Używana przez MagazynWynikow i PamiecWynikow.
+    """
+    return {int(klucz) if klucz.lstrip('-').isdigit() else klucz: wartosc for klucz, wartosc in slownik.items()}
+
+
+def identyfikator_konfiguracji(konfiguracja):
+    """
+    Skrót (16 znaków szesnastkowych) konfiguracji przebiegu zapisanej jako JSON z posortowanymi kluczami.
+    """
+    tekst = json.dumps(konfiguracja, sort_keys=True)
+    return hashlib.sha256(tekst.encode()).hexdigest()[:16]
+
+
+class MagazynWynikow:
+    """
+    Trwały magazyn wyników symulacji w bazie SQLite.
+    Każda zakończona jednostka pracy (prawdopodobieństwo błędu, fragment wiadomości) jest zapisywana
+    i zatwierdzana od razu, więc przerwany przebieg można wznowić, licząc tylko brakujące jednostki.
+    Parametry:
+    - sciezka: Ścieżka pliku bazy danych (tworzony, jeśli nie istnieje).
+    """
+    def __init__(self, sciezka):
+        self.sciezka = sciezka
+        self.polaczenie = sqlite3.connect(sciezka)
+        self.polaczenie.executescript(_SCHEMAT)
+
+    def rozpocznij_przebieg(self, konfiguracja, id_przebiegu=None, ziarno=None):
+        """
+        Rejestruje przebieg albo odnajduje wcześniej rozpoczęty.
+        Argumenty:
+        - konfiguracja: Słownik parametrów przebiegu (serializowalny do JSON).
+        - id_przebiegu: Identyfikator przebiegu; domyślnie skrót konfiguracji.
+        - ziarno: Ziarno generatora zapisywane przy nowym przebiegu.
+        Zwraca:
+        - Krotka (id_przebiegu, ziarno); dla wznawianego przebiegu ziarno jest to zapisane wcześniej,
+          więc brakujące jednostki losowane są z tych samych strumieni.
+        Rzuca ValueError, jeśli identyfikator był użyty z inną konfiguracją.
+        """
+        tekst = json.dumps(konfiguracja, sort_keys=True)
+        if id_przebiegu is None:
+            id_przebiegu = identyfikator_konfiguracji(konfiguracja)
+        wiersz = self.polaczenie.execute(
+            "SELECT konfiguracja, ziarno FROM przebiegi WHERE id_przebiegu = ?", (id_przebiegu,)).fetchone()
+        if wiersz is not None:
+            if wiersz[0] != tekst:
+                raise ValueError(f"Przebieg {id_przebiegu} został rozpoczęty z inną konfiguracją.")
+            return id_przebiegu, None if wiersz[1] is None else int(wiersz[1])
+        with self.polaczenie:
+            self.polaczenie.execute("INSERT INTO przebiegi VALUES (?, ?, ?)",
+                                    (id_przebiegu, tekst, None if ziarno is None else str(ziarno)))
+        return id_przebiegu, ziarno
+
+    def zapisz(self, id_przebiegu, prawd_bledu, fragment, wynik):
+        """
+        Zapisuje i zatwierdza wynik jednej jednostki pracy (wynik częściowy lub pełny słownik wyniku).
+        """
+        with self.polaczenie:
+            self.polaczenie.execute("INSERT OR REPLACE INTO jednostki VALUES (?, ?, ?, ?)",
+                                    (id_przebiegu, prawd_bledu, fragment, json.dumps(wynik)))
+
+    def zakonczone(self, id_przebiegu):
+        """
+        Zwraca słownik {(prawd_bledu, fragment): wynik} jednostek zakończonych w danym przebiegu.
+        """
+        wiersze = self.polaczenie.execute(
+            "SELECT prawd_bledu, fragment, wynik FROM jednostki WHERE id_przebiegu = ?", (id_przebiegu,))
+        return {(prawd_bledu, fragment): json.loads(wynik, object_hook=klucze_liczbowe)
+                for prawd_bledu, fragment, wynik in wiersze}
+
+    def zamknij(self):
+        self.polaczenie.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *wyjatek):
+        self.zamknij()
@@ -0,0 +1,51 @@
+import os
+import tempfile
+import unittest
+from MagazynWynikow import MagazynWynikow, CALY_PUNKT, identyfikator_konfiguracji
+
+class TestMagazynWynikow(unittest.TestCase):
+    def setUp(self):
+        katalog = tempfile.TemporaryDirectory()
+        self.addCleanup(katalog.cleanup)
+        self.sciezka = os.path.join(katalog.name, 'magazyn.sqlite')
+        self.konfiguracja = {'mode': 'pipeline', 'error_probs': [0.01, 0.02], 'shard_size': 100}
+        self.czesciowy = {'total_bits': 700, 'incorrect_bits': {'bch': 3, 'bch_ge': 5},
+                          'error_dists': {'bch': {0: 97, 1: 3}, 'bch_ge': {0: 96, 1: 3, 2: 1}}}
+
+    def test_resume_after_interruption(self):
+        """Test that a reopened store returns the finished units and the seed of the interrupted run."""
+        ziarno = 2 ** 100 + 1
+        with MagazynWynikow(self.sciezka) as magazyn:
+            id_przebiegu, zapisane_ziarno = magazyn.rozpocznij_przebieg(self.konfiguracja, ziarno=ziarno)
+            self.assertEqual(zapisane_ziarno, ziarno)
+            magazyn.zapisz(id_przebiegu, 0.01, 0, self.czesciowy)
+            magazyn.zapisz(id_przebiegu, 0.02, CALY_PUNKT, {'error_prob': 0.02})
+        # Przebieg przerwany - wznawiamy go w nowym połączeniu
+        with MagazynWynikow(self.sciezka) as magazyn:
+            id_wznowienia, zapisane_ziarno = magazyn.rozpocznij_przebieg(self.konfiguracja, ziarno=5)
+            self.assertEqual(id_wznowienia, id_przebiegu)
+            self.assertEqual(zapisane_ziarno, ziarno)
+            zakonczone = magazyn.zakonczone(id_przebiegu)
+        self.assertEqual(zakonczone, {(0.01, 0): self.czesciowy, (0.02, CALY_PUNKT): {'error_prob': 0.02}})
+
+    def test_rewritten_unit_replaced(self):
+        """Test that storing a unit again replaces its earlier result."""
+        with MagazynWynikow(self.sciezka) as magazyn:
+            id_przebiegu, _ = magazyn.rozpocznij_przebieg(self.konfiguracja)
+            magazyn.zapisz(id_przebiegu, 0.01, 0, {'total_bits': 1})
+            magazyn.zapisz(id_przebiegu, 0.01, 0, self.czesciowy)
+            self.assertEqual(magazyn.zakonczone(id_przebiegu), {(0.01, 0): self.czesciowy})
+
+    def test_different_configuration_rejected(self):
+        """Test that a run id cannot be resumed with a different configuration."""
+        with MagazynWynikow(self.sciezka) as magazyn:
+            magazyn.rozpocznij_przebieg(self.konfiguracja, 'przebieg', 1)
+            with self.assertRaises(ValueError):
+                magazyn.rozpocznij_przebieg(dict(self.konfiguracja, shard_size=50), 'przebieg', 1)
+            # Bez podanego identyfikatora inna konfiguracja to osobny przebieg
+            inny, _ = magazyn.rozpocznij_przebieg(dict(self.konfiguracja, shard_size=50))
+            self.assertNotEqual(inny, identyfikator_konfiguracji(self.konfiguracja))
+            self.assertEqual(magazyn.zakonczone(inny), {})
+
+if __name__ == '__main__':
+    unittest.main()
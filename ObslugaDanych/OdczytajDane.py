@@ -1,23 +1,181 @@
 import os
+from itertools import islice
+import numpy as np
+
+# Nagłówek pliku ze spakowanymi wiadomościami: znacznik i długość wiadomości w bitach (uint64)
+ZNACZNIK_SPAKOWANY = b"NIDUCBIT"
+ROZMIAR_NAGLOWKA = len(ZNACZNIK_SPAKOWANY) + 8
+
+# Domyślna liczba wiadomości w jednym bloku zwracanym przez czytaj_bloki
+DOMYSLNY_ROZMIAR_BLOKU = 65536
+
+
+def zapisz_spakowane(sciezka_do_pliku, dane):
+    """
+    Zapisuje macierz wiadomości w formacie spakowanym: nagłówek, a po nim każda wiadomość
+    spakowana po 8 bitów w bajcie (np.packbits, ostatni bajt dopełniony zerami).
+    Argumenty:
+    - sciezka_do_pliku: Ścieżka pliku wyjściowego.
+    - dane: Tablica bitów o kształcie (N, L).
+    """
+    dane = np.asarray(dane, dtype=np.uint8)
+    with open(sciezka_do_pliku, 'wb') as plik:
+        plik.write(ZNACZNIK_SPAKOWANY)
+        plik.write(np.uint64(dane.shape[1]).tobytes())
+        plik.write(np.packbits(dane, axis=1).tobytes())
+
+
 class OdczytDanych:
     """
-    Klasa do odczytu danych binarnych z pliku tekstowego.
+    Klasa do odczytu danych binarnych z pliku.
+    Obsługiwane formaty:
+    - "tekst": jedna wiadomość w linii, znaki '0' i '1' (domyślny),
+    - "spakowany": plik zapisany przez zapisz_spakowane (8 bitów w bajcie),
+    - "memmap": surowe bajty 0/1, jeden bajt na bit, mapowane do pamięci (wymaga dlugosc_wiadomosci).
+    Przy format=None format wybierany jest po rozszerzeniu: .bin - spakowany, .u8 - memmap, inne - tekst.
     """
-    def __init__(self, sciezka_do_pliku):
+    def __init__(self, sciezka_do_pliku, format=None, dlugosc_wiadomosci=None):
         self.sciezka_do_pliku = sciezka_do_pliku
+        if format is None:
+            rozszerzenie = os.path.splitext(sciezka_do_pliku)[1]
+            format = {'.bin': 'spakowany', '.u8': 'memmap'}.get(rozszerzenie, 'tekst')
+        if format not in ('tekst', 'spakowany', 'memmap'):
+            raise ValueError(f"Nieznany format danych: {format}")
+        if format == 'memmap' and dlugosc_wiadomosci is None:
+            raise ValueError("Format memmap wymaga podania dlugosc_wiadomosci.")
+        self.format = format
+        self.dlugosc_wiadomosci = dlugosc_wiadomosci
+
+    def _sprawdz_plik(self):
+        if not os.path.exists(self.sciezka_do_pliku):
+            raise FileNotFoundError(f"Plik {self.sciezka_do_pliku} nie istnieje.")
 
     def odczytaj_dane(self):
         """
         Odczytuje linie z pliku i filtruje tylko te, które są w formacie binarnym.
         Zwraca listę binarnych ciągów bitów.
         """
+        if self.format != 'tekst':
+            return self.odczytaj_macierz().tolist()
+
         dane = []
-        if not os.path.exists(self.sciezka_do_pliku):
-            raise FileNotFoundError(f"Plik {self.sciezka_do_pliku} nie istnieje.")
+        self._sprawdz_plik()
 
         with open(self.sciezka_do_pliku, 'r') as plik:
             for linia in plik:
                 linia = linia.strip()  # Usuń białe znaki
-                if all(znak in {'0', '1'} for znak in linia):  # Sprawdź, czy linia jest binarna
+                if not linia.strip('01'):  # Sprawdź, czy linia jest binarna
                     dane.append([int(bit) for bit in linia])  # Przekształć ciąg na listę bitów
-        return dane
\ No newline at end of file
+        return dane
+
+    def czytaj_bloki(self, rozmiar_bloku=DOMYSLNY_ROZMIAR_BLOKU):
+        """
+        Czyta plik porcjami, bez wczytywania całości do pamięci.
+        Puste i niebinarne linie pliku tekstowego są pomijane.
+        Argumenty:
+        - rozmiar_bloku: Maksymalna liczba wiadomości w jednym bloku.
+        Zwraca:
+        - Generator tablic uint8 o kształcie (liczba wiadomości w bloku, długość wiadomości).
+        """
+        self._sprawdz_plik()
+        if self.format == 'tekst':
+            return self._bloki_tekstowe(rozmiar_bloku)
+        if self.format == 'spakowany':
+            return self._bloki_spakowane(rozmiar_bloku)
+        return self._bloki_memmap(rozmiar_bloku)
+
+    def ksztalt(self):
+        """
+        Zwraca kształt (liczba wiadomości, długość wiadomości) macierzy z pliku bez wczytywania jej.
+        Formaty spakowany i memmap liczone są z nagłówka i rozmiaru pliku, a plik tekstowy
+        jest przeglądany linia po linii. Pusty plik tekstowy ma długość dlugosc_wiadomosci lub 0.
+        Rzuca ValueError, jeśli wiadomości mają różne długości.
+        """
+        self._sprawdz_plik()
+        rozmiar_pliku = os.path.getsize(self.sciezka_do_pliku)
+        if self.format == 'memmap':
+            return rozmiar_pliku // self.dlugosc_wiadomosci, self.dlugosc_wiadomosci
+        if self.format == 'spakowany':
+            dlugosc = self._dlugosc_spakowanych()
+            return (rozmiar_pliku - ROZMIAR_NAGLOWKA) // max(1, -(-dlugosc // 8)), dlugosc
+        liczba, dlugosc = 0, None
+        with open(self.sciezka_do_pliku, 'rb') as plik:
+            for linia in plik:
+                linia = linia.strip()
+                if linia and not linia.translate(None, b'01'):
+                    if dlugosc is not None and len(linia) != dlugosc:
+                        raise ValueError("Wszystkie wiadomości w pliku muszą mieć tę samą długość.")
+                    liczba, dlugosc = liczba + 1, len(linia)
+        return liczba, dlugosc if dlugosc is not None else (self.dlugosc_wiadomosci or 0)
+
+    def odczytaj_macierz(self, wyjscie=None, ksztalt=None):
+        """
+        Odczytuje wszystkie wiadomości jako jedną macierz uint8 (N, L).
+        Dla formatu memmap bez wyjscie zwraca mapowanie pliku, bez kopiowania danych do pamięci.
+        Argumenty:
+        - wyjscie: Opcjonalna tablica uint8 o kształcie ksztalt() (np. w pamięci współdzielonej),
+          do której bloki są zapisywane kolejno, więc w pamięci jest tylko ona i jeden blok.
+        - ksztalt: Opcjonalny kształt już policzony przez ksztalt(); pomija ponowne przeglądanie
+          pliku tekstowego.
+        Zwraca:
+        - Macierz wiadomości (wyjscie, jeśli podano).
+        """
+        if self.format == 'memmap' and wyjscie is None:
+            self._sprawdz_plik()
+            return self._mapuj()
+        if ksztalt is None:
+            ksztalt = self.ksztalt()
+        ksztalt = tuple(ksztalt)
+        if wyjscie is None:
+            wyjscie = np.empty(ksztalt, dtype=np.uint8)
+        elif wyjscie.shape != ksztalt:
+            raise ValueError(f"Tablica wyjściowa ma kształt {wyjscie.shape}, a dane {ksztalt}.")
+        poczatek = 0
+        for blok in self.czytaj_bloki():
+            wyjscie[poczatek:poczatek + len(blok)] = blok
+            poczatek += len(blok)
+        return wyjscie
+
+    def _bloki_tekstowe(self, rozmiar_bloku):
+        with open(self.sciezka_do_pliku, 'rb') as plik:
+            while True:
+                linie = list(islice(plik, rozmiar_bloku))
+                if not linie:
+                    return
+                # Zostają tylko niepuste linie złożone wyłącznie z '0' i '1'
+                linie = [linia.strip() for linia in linie]
+                linie = [linia for linia in linie if linia and not linia.translate(None, b'01')]
+                if not linie:
+                    continue
+                dlugosc = len(linie[0])
+                if any(len(linia) != dlugosc for linia in linie):
+                    raise ValueError("Wszystkie wiadomości w pliku muszą mieć tę samą długość.")
+                blok = np.frombuffer(b''.join(linie), dtype=np.uint8).reshape(len(linie), dlugosc)
+                yield blok - ord('0')
+
+    def _dlugosc_spakowanych(self):
+        with open(self.sciezka_do_pliku, 'rb') as plik:
+            naglowek = plik.read(ROZMIAR_NAGLOWKA)
+        if naglowek[:len(ZNACZNIK_SPAKOWANY)] != ZNACZNIK_SPAKOWANY:
+            raise ValueError(f"Plik {self.sciezka_do_pliku} nie jest w formacie spakowanym.")
+        return int(np.frombuffer(naglowek[len(ZNACZNIK_SPAKOWANY):], dtype=np.uint64)[0])
+
+    def _bloki_spakowane(self, rozmiar_bloku):
+        dlugosc = self._dlugosc_spakowanych()
+        with open(self.sciezka_do_pliku, 'rb') as plik:
+            plik.seek(ROZMIAR_NAGLOWKA)
+            bajty_na_wiadomosc = -(-dlugosc // 8)
+            while True:
+                porcja = plik.read(rozmiar_bloku * bajty_na_wiadomosc)
+                if not porcja:
+                    return
+                spakowane = np.frombuffer(porcja, dtype=np.uint8).reshape(-1, bajty_na_wiadomosc)
+                yield np.unpackbits(spakowane, axis=1, count=dlugosc)
+
+    def _mapuj(self):
+        return np.memmap(self.sciezka_do_pliku, dtype=np.uint8, mode='r').reshape(-1, self.dlugosc_wiadomosci)
+
+    def _bloki_memmap(self, rozmiar_bloku):
+        mapa = self._mapuj()
+        for poczatek in range(0, len(mapa), rozmiar_bloku):
+            yield mapa[poczatek:poczatek + rozmiar_bloku]
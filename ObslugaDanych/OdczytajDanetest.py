@@ -0,0 +1,63 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from OdczytajDane import OdczytDanych, zapisz_spakowane
+
+class TestOdczytDanych(unittest.TestCase):
+    def setUp(self):
+        katalog = tempfile.TemporaryDirectory()
+        self.addCleanup(katalog.cleanup)
+        self.katalog = katalog.name
+        self.dane = np.random.default_rng(0).integers(0, 2, (10, 13), dtype=np.uint8)
+
+    def pliki(self):
+        """Zapisuje dane w każdym formacie i zwraca czytniki."""
+        tekst = os.path.join(self.katalog, 'dane.txt')
+        with open(tekst, 'w') as plik:
+            for i, wiersz in enumerate(self.dane):
+                plik.write(''.join(map(str, wiersz)) + '\n' + ('\n' if i == 4 else ''))
+        spakowany = os.path.join(self.katalog, 'dane.bin')
+        zapisz_spakowane(spakowany, self.dane)
+        surowy = os.path.join(self.katalog, 'dane.u8')
+        self.dane.tofile(surowy)
+        return [OdczytDanych(tekst), OdczytDanych(spakowany), OdczytDanych(surowy, dlugosc_wiadomosci=13)]
+
+    def test_multi_block_read(self):
+        """Test that a file read in several blocks gives back every message in order."""
+        for czytnik in self.pliki():
+            bloki = list(czytnik.czytaj_bloki(rozmiar_bloku=3))
+            self.assertGreater(len(bloki), 2, czytnik.format)
+            self.assertTrue(all(len(blok) <= 3 for blok in bloki))
+            np.testing.assert_array_equal(np.concatenate(bloki), self.dane)
+
+    def test_read_into_buffer(self):
+        """Test that the matrix can be read straight into a preallocated buffer of ksztalt()."""
+        for czytnik in self.pliki():
+            self.assertEqual(czytnik.ksztalt(), self.dane.shape, czytnik.format)
+            wyjscie = np.zeros(czytnik.ksztalt(), dtype=np.uint8)
+            self.assertIs(czytnik.odczytaj_macierz(wyjscie), wyjscie)
+            np.testing.assert_array_equal(wyjscie, self.dane)
+            np.testing.assert_array_equal(czytnik.odczytaj_macierz(), self.dane)
+
+    def test_read_with_known_shape(self):
+        """Test that a shape passed to odczytaj_macierz is used instead of scanning the file again."""
+        for czytnik in self.pliki():
+            ksztalt = czytnik.ksztalt()
+            czytnik.ksztalt = None  # kolejne wywołanie ksztalt() zakończyłoby się błędem
+            wyjscie = np.zeros(ksztalt, dtype=np.uint8)
+            czytnik.odczytaj_macierz(wyjscie, ksztalt=ksztalt)
+            np.testing.assert_array_equal(wyjscie, self.dane)
+            with self.assertRaises(ValueError):
+                czytnik.odczytaj_macierz(wyjscie, ksztalt=(ksztalt[0] + 1, ksztalt[1]))
+
+    def test_length_mismatch_across_blocks(self):
+        """Test that messages of different lengths raise ValueError even in different blocks."""
+        sciezka = os.path.join(self.katalog, 'zle.txt')
+        with open(sciezka, 'w') as plik:
+            plik.write('0101\n0110\n011\n')
+        with self.assertRaises(ValueError):
+            OdczytDanych(sciezka).odczytaj_macierz()
+
+if __name__ == '__main__':
+    unittest.main()
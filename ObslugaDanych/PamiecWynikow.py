@@ -0,0 +1,105 @@
+import hashlib
+import json
+import os
+import time
+from functools import lru_cache
+from ObslugaDanych.MagazynWynikow import klucze_liczbowe
+
+# Rozmiar bloku czytanego przy liczeniu skrótu pliku danych
+_ROZMIAR_BLOKU = 1 << 20
+
+
+@lru_cache(maxsize=None)
+def _skrot_pliku(sciezka, rozmiar, czas_modyfikacji):
+    skrot = hashlib.sha256()
+    with open(sciezka, 'rb') as plik:
+        for blok in iter(lambda: plik.read(_ROZMIAR_BLOKU), b''):
+            skrot.update(blok)
+    return skrot.hexdigest()
+
+
+def skrot_danych(sciezka):
+    """
+    Skrót SHA-256 zawartości pliku danych wejściowych.
+    Wynik jest zapamiętywany dla (ścieżka, rozmiar, czas modyfikacji), więc plik czytany jest raz.
+    """
+    stat = os.stat(sciezka)
+    return _skrot_pliku(os.path.abspath(sciezka), stat.st_size, stat.st_mtime_ns)
+
+
+def klucz_wyniku(konfiguracja):
+    """
+    Adres wyniku w pamięci: skrót SHA-256 konfiguracji punktu zapisanej jako JSON z posortowanymi kluczami.
+    """
+    return hashlib.sha256(json.dumps(konfiguracja, sort_keys=True).encode()).hexdigest()
+
+
+class PamiecWynikow:
+    """
+    Pamięć podręczna wyników symulacji adresowana treścią: każdy punkt (jedno prawdopodobieństwo
+    błędu) zapisywany jest w osobnym pliku JSON, którego nazwą jest skrót pełnej konfiguracji punktu.
+    Pliki nieużywane dłużej niż maks_wiek_dni są usuwane, a gdy katalog przekroczy maks_rozmiar bajtów,
+    usuwane są najdawniej używane pliki.
+    Parametry:
+    - katalog: Katalog pamięci (tworzony przy pierwszym zapisie).
+    - maks_rozmiar: Największy łączny rozmiar plików w bajtach.
+    - maks_wiek_dni: Największy czas od ostatniego użycia pliku w dniach.
+    """
+    def __init__(self, katalog, maks_rozmiar, maks_wiek_dni):
+        self.katalog = katalog
+        self.maks_rozmiar = maks_rozmiar
+        self.maks_wiek = maks_wiek_dni * 24 * 3600
+
+    def _sciezka(self, klucz):
+        return os.path.join(self.katalog, f"{klucz}.json")
+
+    def pobierz(self, konfiguracja):
+        """
+        Zwraca zapisany wynik dla konfiguracji albo None, jeśli go nie ma.
+        Trafienie odświeża czas użycia pliku.
+        """
+        sciezka = self._sciezka(klucz_wyniku(konfiguracja))
+        try:
+            with open(sciezka) as plik:
+                wynik = json.load(plik, object_hook=klucze_liczbowe)
+            os.utime(sciezka)
+        except (OSError, ValueError):
+            # Brak pliku lub plik uszkodzony - wynik trzeba policzyć
+            return None
+        return wynik
+
+    def zapisz(self, konfiguracja, wynik):
+        """
+        Zapisuje wynik pod adresem konfiguracji i usuwa nadmiarowe pliki.
+        Plik zapisywany jest pod nazwą tymczasową i przenoszony na miejsce, więc równoległe
+        procesy nigdy nie odczytają niepełnego wyniku.
+        """
+        os.makedirs(self.katalog, exist_ok=True)
+        sciezka = self._sciezka(klucz_wyniku(konfiguracja))
+        tymczasowa = f"{sciezka}.{os.getpid()}.tmp"
+        with open(tymczasowa, 'w') as plik:
+            json.dump(wynik, plik)
+        os.replace(tymczasowa, sciezka)
+        self.usun_nadmiar()
+
+    def usun_nadmiar(self):
+        """
+        Usuwa pliki starsze niż maks_wiek, a potem najdawniej używane, dopóki łączny rozmiar
+        przekracza maks_rozmiar.
+        """
+        pliki = []
+        for wpis in os.scandir(self.katalog):
+            if wpis.name.endswith('.json'):
+                stat = wpis.stat()
+                pliki.append((stat.st_mtime, stat.st_size, wpis.path))
+        teraz = time.time()
+        rozmiar = sum(wielkosc for _, wielkosc, _ in pliki)
+        for czas_uzycia, wielkosc, sciezka in sorted(pliki):
+            if teraz - czas_uzycia <= self.maks_wiek and rozmiar <= self.maks_rozmiar:
+                break
+            try:
+                os.remove(sciezka)
+            except FileNotFoundError:
+                # Usunięty już przez inny proces
+                pass
+            rozmiar -= wielkosc
@@ -0,0 +1,69 @@
+import os
+import tempfile
+import time
+import unittest
+from PamiecWynikow import PamiecWynikow, klucz_wyniku
+
+class TestPamiecWynikow(unittest.TestCase):
+    def setUp(self):
+        katalog = tempfile.TemporaryDirectory()
+        self.addCleanup(katalog.cleanup)
+        self.katalog = katalog.name
+        self.konfiguracja = {'mode': 'pipeline', 'error_prob': 0.01, 'seed': 7}
+        self.wynik = {'error_prob': 0.01, 'incorrect_bits_bch': 12, 'error_dist_bch': {0: 90, 1: 10}}
+
+    def pamiec(self, maks_rozmiar=1 << 20, maks_wiek_dni=30):
+        return PamiecWynikow(self.katalog, maks_rozmiar, maks_wiek_dni)
+
+    def postarz(self, konfiguracja, sekundy):
+        """Cofa czas ostatniego użycia pliku konfiguracji o podaną liczbę sekund."""
+        sciezka = os.path.join(self.katalog, f"{klucz_wyniku(konfiguracja)}.json")
+        czas = time.time() - sekundy
+        os.utime(sciezka, (czas, czas))
+
+    def test_hit_and_miss(self):
+        """Test that a stored point is returned and a point with a changed parameter is not."""
+        pamiec = self.pamiec()
+        self.assertIsNone(pamiec.pobierz(self.konfiguracja))
+        pamiec.zapisz(self.konfiguracja, self.wynik)
+        # Klucze rozkładów wracają jako liczby całkowite
+        self.assertEqual(pamiec.pobierz(self.konfiguracja), self.wynik)
+        for klucz, wartosc in [('error_prob', 0.02), ('seed', 8), ('mode', 'adaptive')]:
+            self.assertIsNone(pamiec.pobierz(dict(self.konfiguracja, **{klucz: wartosc})), klucz)
+
+    def test_corrupted_file_is_a_miss(self):
+        """Test that an unreadable cache file is treated as a miss."""
+        pamiec = self.pamiec()
+        pamiec.zapisz(self.konfiguracja, self.wynik)
+        with open(os.path.join(self.katalog, f"{klucz_wyniku(self.konfiguracja)}.json"), 'w') as plik:
+            plik.write('{')
+        self.assertIsNone(pamiec.pobierz(self.konfiguracja))
+
+    def test_least_recently_used_evicted(self):
+        """Test that above the size limit the least recently used points are evicted first."""
+        pamiec = self.pamiec()
+        konfiguracje = [dict(self.konfiguracja, error_prob=p) for p in (0.01, 0.02, 0.03)]
+        for wiek, konfiguracja in zip((300, 200, 100), konfiguracje):
+            pamiec.zapisz(konfiguracja, self.wynik)
+            self.postarz(konfiguracja, wiek)
+        # Trafienie odświeża najstarszy punkt, więc usunięty zostaje drugi z kolei
+        self.assertIsNotNone(pamiec.pobierz(konfiguracje[0]))
+        rozmiar = os.path.getsize(os.path.join(self.katalog, f"{klucz_wyniku(konfiguracje[0])}.json"))
+        pamiec.maks_rozmiar = 3 * rozmiar
+        pamiec.zapisz(dict(self.konfiguracja, error_prob=0.04), self.wynik)
+        self.assertIsNone(pamiec.pobierz(konfiguracje[1]))
+        for konfiguracja in (konfiguracje[0], konfiguracje[2], dict(self.konfiguracja, error_prob=0.04)):
+            self.assertIsNotNone(pamiec.pobierz(konfiguracja))
+
+    def test_old_points_evicted(self):
+        """Test that points unused for longer than the age limit are evicted."""
+        pamiec = self.pamiec(maks_wiek_dni=1)
+        stara = dict(self.konfiguracja, error_prob=0.02)
+        pamiec.zapisz(stara, self.wynik)
+        self.postarz(stara, 2 * 24 * 3600)
+        pamiec.zapisz(self.konfiguracja, self.wynik)
+        self.assertIsNone(pamiec.pobierz(stara))
+        self.assertEqual(pamiec.pobierz(self.konfiguracja), self.wynik)
+
+if __name__ == '__main__':
+    unittest.main()
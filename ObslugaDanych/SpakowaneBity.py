@@ -0,0 +1,46 @@
+import numpy as np
+
+# Liczba bitów w jednym słowie maszynowym kontenera
+BITY_W_SLOWIE = 64
+
+
+def liczba_slow(liczba_bitow):
+    """
+    Liczba słów uint64 potrzebnych na liczba_bitow bitów.
+    """
+    return -(-liczba_bitow // BITY_W_SLOWIE)
+
+
+def spakuj(bity):
+    """
+    Pakuje bity ostatniej osi do słów uint64: bit i trafia do słowa i // 64 na pozycję i % 64
+    (najmłodszy bit pierwszy), a ostatnie słowo dopełniane jest zerami.
+    :param bity: Tablica bitów (0 lub 1) o kształcie (..., L)
+    :return: Tablica uint64 o kształcie (..., liczba_slow(L))
+    """
+    bity = np.asarray(bity, dtype=np.uint8)
+    dlugosc = bity.shape[-1]
+    dopelnione = np.zeros(bity.shape[:-1] + (liczba_slow(dlugosc) * BITY_W_SLOWIE,), dtype=np.uint8)
+    dopelnione[..., :dlugosc] = bity
+    # Kolejność bajtów little-endian, żeby bit i był bitem i % 64 w słowie
+    bajty = np.packbits(dopelnione, axis=-1, bitorder='little')
+    return bajty.view('<u8').astype(np.uint64, copy=False)
+
+
+def rozpakuj(slowa, liczba_bitow):
+    """
+    Odwrotność spakuj: rozpakowuje liczba_bitow pierwszych bitów ze słów uint64.
+    :param slowa: Tablica uint64 o kształcie (..., W)
+    :param liczba_bitow: Liczba użytecznych bitów
+    :return: Tablica uint8 o kształcie (..., liczba_bitow)
+    """
+    bajty = np.ascontiguousarray(slowa, dtype='<u8').view(np.uint8)
+    return np.unpackbits(bajty, axis=-1, count=liczba_bitow, bitorder='little')
+
+
+def maska_pozycji(liczba_bitow):
+    """
+    Słowa uint64 z ustawionymi liczba_bitow pierwszymi bitami (maska bitów użytecznych).
+    """
+    return spakuj(np.ones(liczba_bitow, dtype=np.uint8))
+
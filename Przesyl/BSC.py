@@ -1,13 +1,172 @@
-import random
+import math
+import numpy as np
+from ObslugaDanych.SpakowaneBity import BITY_W_SLOWIE, liczba_slow, spakuj
+
+# Poniżej tego prawdopodobieństwa tryb "auto" losuje odstępy między błędami zamiast maski bit po bicie
+PROG_TRYBU_RZADKIEGO = 0.01
+
+
+def losuj_pozycje_bledow(generator, prawd_bledu, liczba_bitow):
+    """
+    Losuje pozycje błędów niezależnych (Bernoulliego) przez odstępy geometryczne między nimi.
+    Koszt zależy od liczby błędów, a nie od liczby bitów.
+    Argumenty:
+    - generator: Generator liczb losowych NumPy.
+    - prawd_bledu: Prawdopodobieństwo błędu dla każdego bitu.
+    - liczba_bitow: Długość strumienia bitów.
+    Zwraca:
+    - Posortowana tablica int64 z indeksami przekłamanych bitów.
+    """
+    if prawd_bledu <= 0 or liczba_bitow <= 0:
+        return np.empty(0, dtype=np.int64)
+    pozycje = []
+    ostatnia = -1
+    while True:
+        # Losujemy z zapasem, żeby zwykle wystarczyło jedno wywołanie generatora
+        oczekiwane = (liczba_bitow - 1 - ostatnia) * prawd_bledu
+        rozmiar = int(oczekiwane + 4 * math.sqrt(oczekiwane) + 16)
+        blok = ostatnia + np.cumsum(generator.geometric(prawd_bledu, rozmiar))
+        pozycje.append(blok[blok < liczba_bitow])
+        if blok[-1] >= liczba_bitow:
+            return np.concatenate(pozycje)
+        ostatnia = blok[-1]
+
+
+def log_iloraz_wiarygodnosci(prawd_bledu, prawd_obciazone, maska):
+    """
+    Logarytm ilorazu wiarygodności P/Q dla każdego bitu, gdy błędy losowano z prawdopodobieństwem
+    prawd_obciazone zamiast prawd_bledu (losowanie ważone, importance sampling).
+    Argumenty:
+    - prawd_bledu: Prawdziwe prawdopodobieństwo błędu (liczba lub tablica zgodna z maska).
+    - prawd_obciazone: Prawdopodobieństwo błędu, z którego losowano (liczba lub tablica).
+    - maska: Tablica, w której 1 oznacza wylosowany błąd.
+    Zwraca:
+    - Tablica float64 kształtu maski.
+    """
+    with np.errstate(divide='ignore'):
+        return np.where(maska,
+                        np.log(prawd_bledu) - np.log(prawd_obciazone),
+                        np.log1p(-np.asarray(prawd_bledu, dtype=float)) - np.log1p(-np.asarray(prawd_obciazone, dtype=float)))
+
 
 class KanalBSC:
     """
     Model kanału BSC (Binary Symmetric Channel), który symuluje przypadkowe błędy w przesyłanych bitach.
     Parametry:
     - prawd_bledu: Prawdopodobieństwo wystąpienia błędu dla każdego bitu (wartość od 0 do 1).
+    - generator: Generator liczb losowych NumPy (domyślnie nowy np.random.default_rng()).
+    - tryb: "gesty" (maska losowana bit po bicie), "rzadki" (odstępy geometryczne między błędami)
+      lub "auto" (rzadki, gdy prawd_bledu < PROG_TRYBU_RZADKIEGO).
     """
-    def __init__(self, prawd_bledu):
+    def __init__(self, prawd_bledu, generator=None, tryb="auto"):
+        if tryb not in ("auto", "gesty", "rzadki"):
+            raise ValueError(f"Nieznany tryb kanału: {tryb}")
         self.prawd_bledu = prawd_bledu
+        self.generator = generator if generator is not None else np.random.default_rng()
+        self.tryb = tryb
+
+    def czy_rzadki(self):
+        """
+        Sprawdza, czy kanał losuje błędy w trybie rzadkim.
+        """
+        return self.tryb == "rzadki" or (self.tryb == "auto" and self.prawd_bledu < PROG_TRYBU_RZADKIEGO)
+
+    def pozycje_bledow(self, liczba_bitow):
+        """
+        Losuje tylko pozycje przekłamanych bitów (tryb rzadki).
+        Argumenty:
+        - liczba_bitow: Długość przesyłanego strumienia.
+        Zwraca:
+        - Posortowana tablica int64 z indeksami przekłamanych bitów.
+        """
+        return losuj_pozycje_bledow(self.generator, self.prawd_bledu, liczba_bitow)
+
+    def maska_bledow(self, rozmiar):
+        """
+        Losuje maskę błędów całym blokiem, jednym wywołaniem generatora
+        (w trybie rzadkim ustawiane są tylko wylosowane pozycje).
+        Argumenty:
+        - rozmiar: Kształt maski (liczba bitów lub krotka wymiarów).
+        Zwraca:
+        - Tablica uint8, w której 1 oznacza bit przekłamany przez kanał.
+        """
+        if self.czy_rzadki():
+            maska = np.zeros(rozmiar, dtype=np.uint8)
+            maska.reshape(-1)[self.pozycje_bledow(maska.size)] = 1
+            return maska
+        return (self.generator.random(rozmiar) < self.prawd_bledu).astype(np.uint8)
+
+    def transmituj_tablice(self, dane, losy=None):
+        """
+        Przesyła tablicę bitów przez kanał BSC, nakładając maskę błędów operacją XOR.
+        Argumenty:
+        - dane: Tablica NumPy bitów (0 lub 1) o dowolnym kształcie.
+        - losy: Opcjonalne liczby losowe z [0, 1) o kształcie danych; bit jest przekłamany, gdy jego
+          los < prawd_bledu. Pozwala kilku kanałom korzystać z tych samych losów (wspólne liczby losowe).
+        Zwraca:
+        - Tablica uint8 tego samego kształtu po przesłaniu przez kanał.
+        """
+        dane = np.asarray(dane, dtype=np.uint8)
+        if losy is not None:
+            return dane ^ (losy < self.prawd_bledu).astype(np.uint8)
+        if self.czy_rzadki():
+            # Kopiujemy dane i odwracamy tylko wylosowane pozycje
+            wynik = dane.copy()
+            wynik.reshape(-1)[self.pozycje_bledow(wynik.size)] ^= 1
+            return wynik
+        return dane ^ self.maska_bledow(dane.shape)
+
+    def transmituj_istotnie(self, dane, prawd_obciazone):
+        """
+        Przesyła tablicę bitów przez kanał obciążony (prawd_obciazone zamiast prawd_bledu)
+        i zwraca wagi, które czynią estymatory nieobciążonymi względem prawdziwego kanału.
+        Argumenty:
+        - dane: Tablica NumPy bitów o kształcie (N, L) lub (L,).
+        - prawd_obciazone: Prawdopodobieństwo błędu kanału obciążonego, z przedziału (0, 1).
+        Zwraca:
+        - Dane po kanale obciążonym oraz logarytmy wag (iloraz wiarygodności) dla każdego wiersza.
+        """
+        if not 0 < prawd_obciazone < 1:
+            raise ValueError("Prawdopodobieństwo kanału obciążonego musi należeć do przedziału (0, 1).")
+        dane = np.asarray(dane, dtype=np.uint8)
+        maska = self.generator.random(dane.shape) < prawd_obciazone
+        log_wagi = log_iloraz_wiarygodnosci(self.prawd_bledu, prawd_obciazone, maska).sum(axis=-1)
+        return dane ^ maska.astype(np.uint8), log_wagi
+
+    def maska_bledow_spakowana(self, liczba_wierszy, liczba_bitow):
+        """
+        Losuje maskę błędów dla liczba_wierszy wierszy po liczba_bitow bitów, spakowaną do słów
+        uint64 (format ObslugaDanych.SpakowaneBity). W trybie rzadkim bity ustawiane są wprost
+        w słowach, bez rozpakowanej maski. Losowania są te same co w maska_bledow((N, L)).
+        Argumenty:
+        - liczba_wierszy: Liczba wierszy (słów kodowych).
+        - liczba_bitow: Liczba bitów w wierszu.
+        Zwraca:
+        - Tablica uint64 (liczba_wierszy, ceil(liczba_bitow / 64)).
+        """
+        if not self.czy_rzadki():
+            return spakuj(self.maska_bledow((liczba_wierszy, liczba_bitow)))
+        maska = np.zeros((liczba_wierszy, liczba_slow(liczba_bitow)), dtype=np.uint64)
+        wiersze, kolumny = np.divmod(self.pozycje_bledow(liczba_wierszy * liczba_bitow), liczba_bitow)
+        bity = np.left_shift(np.uint64(1), (kolumny % BITY_W_SLOWIE).astype(np.uint64))
+        np.bitwise_or.at(maska, (wiersze, kolumny // BITY_W_SLOWIE), bity)
+        return maska
+
+    def transmituj_spakowane_slowa(self, slowa, liczba_bitow, losy=None):
+        """
+        Przesyła wiersze bitów spakowane do słów uint64 (format ObslugaDanych.SpakowaneBity),
+        nakładając spakowaną maskę błędów operacją XOR.
+        Argumenty:
+        - slowa: Tablica uint64 (N, ceil(liczba_bitow / 64)).
+        - liczba_bitow: Liczba użytecznych bitów w wierszu.
+        - losy: Opcjonalne liczby losowe (N, liczba_bitow), jak w transmituj_tablice.
+        Zwraca:
+        - Tablica uint64 tego samego kształtu po przesłaniu przez kanał.
+        """
+        slowa = np.asarray(slowa, dtype=np.uint64)
+        if losy is not None:
+            return slowa ^ spakuj(losy < self.prawd_bledu)
+        return slowa ^ self.maska_bledow_spakowana(len(slowa), liczba_bitow)
 
     def transmituj(self, dane):
         """
@@ -17,13 +176,4 @@ class KanalBSC:
         Zwraca:
         - Lista bitów po przesłaniu przez kanał (może zawierać błędy).
         """
-        dane_po_transmisji = []
-        for bit in dane:
-            # Losowo zmienia bit, jeśli wygenerowana liczba jest mniejsza niż prawd_bledu
-            if random.random() < self.prawd_bledu:
-                dane_po_transmisji.append(1 - bit)  # Inwersja bitu (0->1 lub 1->0)
-            else:
-                dane_po_transmisji.append(bit)  # Bez zmiany
-        return dane_po_transmisji
-
-
+        return self.transmituj_tablice(dane).tolist()
@@ -0,0 +1,67 @@
+import unittest
+import numpy as np
+from BSC import KanalBSC, PROG_TRYBU_RZADKIEGO, losuj_pozycje_bledow
+from ObslugaDanych.SpakowaneBity import spakuj, rozpakuj
+from ObslugaDanych.LiczenieBledow import zlicz_bledy_spakowane
+
+class TestKanalBSC(unittest.TestCase):
+    def test_sparse_positions(self):
+        """Test that sparse error positions are sorted, distinct and inside the stream."""
+        pozycje = losuj_pozycje_bledow(np.random.default_rng(0), 0.003, 100000)
+        self.assertTrue(np.all(np.diff(pozycje) > 0))
+        self.assertTrue(0 <= pozycje[0] and pozycje[-1] < 100000)
+        self.assertEqual(len(losuj_pozycje_bledow(np.random.default_rng(0), 0.0, 1000)), 0)
+        self.assertEqual(len(losuj_pozycje_bledow(np.random.default_rng(0), 0.5, 0)), 0)
+
+    def test_sparse_mask_is_binomial(self):
+        """Test that errors per block of the sparse mask have the Binomial(n, p) mean and variance."""
+        n, p, liczba = 1000, 0.005, 20000
+        kanal = KanalBSC(p, np.random.default_rng(1), tryb="rzadki")
+        bledy = kanal.maska_bledow((liczba, n)).sum(axis=1)
+        srednia, wariancja = n * p, n * p * (1 - p)
+        self.assertLess(abs(bledy.mean() - srednia), 5 * np.sqrt(wariancja / liczba))
+        # Błąd standardowy wariancji z próby: sqrt((mu4 - sigma^4) / N), mu4 ~ 3 sigma^4 + sigma^2
+        blad_wariancji = np.sqrt((2 * wariancja ** 2 + wariancja) / liczba)
+        self.assertLess(abs(bledy.var(ddof=1) - wariancja), 5 * blad_wariancji)
+
+    def test_sparse_and_dense_agree(self):
+        """Test that sparse and dense transmission flip bits at the same rate."""
+        p, rozmiar = 0.005, 2_000_000
+        rzadki = KanalBSC(p, np.random.default_rng(2), tryb="rzadki").transmituj_tablice(np.zeros(rozmiar))
+        gesty = KanalBSC(p, np.random.default_rng(3), tryb="gesty").transmituj_tablice(np.zeros(rozmiar))
+        odchylenie = np.sqrt(rozmiar * p * (1 - p))
+        self.assertLess(abs(int(rzadki.sum()) - int(gesty.sum())), 5 * np.sqrt(2) * odchylenie)
+
+    def test_packed_mask_matches_unpacked(self):
+        """Test that the packed error mask draws the same errors as the unpacked one for a fixed generator."""
+        liczba_wierszy, liczba_bitow = 500, 15
+        dane = np.random.default_rng(4).integers(0, 2, (liczba_wierszy, liczba_bitow), dtype=np.uint8)
+        for p, tryb in [(0.1, "gesty"), (0.003, "rzadki")]:
+            spakowana = KanalBSC(p, np.random.default_rng(5), tryb).maska_bledow_spakowana(liczba_wierszy, liczba_bitow)
+            rozpakowana = KanalBSC(p, np.random.default_rng(5), tryb).maska_bledow((liczba_wierszy, liczba_bitow))
+            self.assertEqual(spakowana.shape, (liczba_wierszy, 1))
+            np.testing.assert_array_equal(rozpakuj(spakowana, liczba_bitow), rozpakowana)
+            # Przesłanie spakowanych słów daje te same liczby błędów co przesłanie bitów
+            odebrane = KanalBSC(p, np.random.default_rng(6), tryb).transmituj_spakowane_slowa(spakuj(dane), liczba_bitow)
+            oczekiwane = KanalBSC(p, np.random.default_rng(6), tryb).transmituj_tablice(dane)
+            np.testing.assert_array_equal(zlicz_bledy_spakowane(spakuj(dane), odebrane), (dane != oczekiwane).sum(axis=1))
+
+    def test_packed_with_common_numbers(self):
+        """Test that packed transmission with shared uniforms flips the same bits as the unpacked one."""
+        dane = np.random.default_rng(7).integers(0, 2, (40, 70), dtype=np.uint8)
+        losy = np.random.default_rng(8).random(dane.shape)
+        kanal = KanalBSC(0.2)
+        np.testing.assert_array_equal(rozpakuj(kanal.transmituj_spakowane_slowa(spakuj(dane), 70, losy), 70),
+                                      kanal.transmituj_tablice(dane, losy))
+
+    def test_mode_threshold(self):
+        """Test that the automatic mode switches to sparse sampling below PROG_TRYBU_RZADKIEGO."""
+        self.assertTrue(KanalBSC(PROG_TRYBU_RZADKIEGO / 2).czy_rzadki())
+        self.assertFalse(KanalBSC(PROG_TRYBU_RZADKIEGO).czy_rzadki())
+        self.assertTrue(KanalBSC(0.3, tryb="rzadki").czy_rzadki())
+        self.assertFalse(KanalBSC(1e-6, tryb="gesty").czy_rzadki())
+        with self.assertRaises(ValueError):
+            KanalBSC(0.1, tryb="inny")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,4 +1,5 @@
-import random  # Correctly import the random module
+import numpy as np
+from Przesyl.BSC import PROG_TRYBU_RZADKIEGO, losuj_pozycje_bledow, log_iloraz_wiarygodnosci
 
 class KanalGilbertaElliotta:
     """
@@ -9,41 +10,278 @@ class KanalGilbertaElliotta:
     - wysokie_prawd_bledu: Prawdopodobieństwo błędu w stanie "złym".
     - przejscie_dobry_na_zly: Prawdopodobieństwo przejścia ze stanu "dobrego" do "złego".
     - przejscie_zly_na_dobry: Prawdopodobieństwo przejścia ze stanu "złego" do "dobrego".
+    - generator: Generator liczb losowych NumPy (domyślnie nowy np.random.default_rng()).
+    - tryb: "gesty" (stan i błąd losowane bit po bicie), "rzadki" (losowane tylko kandydackie
+      pozycje błędów) lub "auto" (rzadki, gdy oba prawdopodobieństwa błędu < PROG_TRYBU_RZADKIEGO).
     """
-    def __init__(self, niskie_prawd_bledu, wysokie_prawd_bledu, przejscie_dobry_na_zly, przejscie_zly_na_dobry):
+    def __init__(self, niskie_prawd_bledu, wysokie_prawd_bledu, przejscie_dobry_na_zly, przejscie_zly_na_dobry,
+                 generator=None, tryb="auto"):
+        if tryb not in ("auto", "gesty", "rzadki"):
+            raise ValueError(f"Nieznany tryb kanału: {tryb}")
         self.niskie_prawd_bledu = niskie_prawd_bledu
         self.wysokie_prawd_bledu = wysokie_prawd_bledu
         self.przejscie_dobry_na_zly = przejscie_dobry_na_zly
         self.przejscie_zly_na_dobry = przejscie_zly_na_dobry
+        self.generator = generator if generator is not None else np.random.default_rng()
+        self.tryb = tryb
         self.czy_stan_zly = False  # Zaczynamy w stanie "dobrym"
 
-    def transmituj(self, dane):
+    def czy_rzadki(self):
         """
-        Przesyła dane przez kanał Gilberta-Elliotta, wprowadzając błędy grupowe.
+        Sprawdza, czy kanał losuje błędy w trybie rzadkim.
+        """
+        najwieksze = max(self.niskie_prawd_bledu, self.wysokie_prawd_bledu)
+        return self.tryb == "rzadki" or (self.tryb == "auto" and najwieksze < PROG_TRYBU_RZADKIEGO)
+
+    def _prawd_stanu_zlego_po(self, kroki, czy_zly):
+        """
+        Prawdopodobieństwo, że po podanej liczbie bitów kanał będzie w stanie "złym".
+        Korzysta z zamkniętej postaci potęgi macierzy przejść łańcucha dwustanowego.
+        kroki i czy_zly mogą być tablicami (wtedy dla każdej pary osobno).
+        """
+        czy_zly = np.asarray(czy_zly, dtype=float)
+        suma_przejsc = self.przejscie_dobry_na_zly + self.przejscie_zly_na_dobry
+        if suma_przejsc == 0:
+            return czy_zly
+        pi_zly = self.przejscie_dobry_na_zly / suma_przejsc
+        zanik = (1.0 - suma_przejsc) ** np.asarray(kroki)
+        return pi_zly + (czy_zly - pi_zly) * zanik
+
+    def pozycje_bledow(self, liczba_bitow):
+        """
+        Losuje tylko pozycje przekłamanych bitów (tryb rzadki), kontynuując bieżący stan kanału.
+        Kandydaci na błędy są losowani z największym prawdopodobieństwem błędu przez odstępy
+        geometryczne, a stan kanału jest losowany tylko w pozycjach kandydatów (z wielokrokowych
+        prawdopodobieństw przejść). Kandydat staje się błędem z prawdopodobieństwem
+        prawd_bledu(stan) / największe prawd_bledu, co daje ten sam rozkład co pętla bit po bicie.
         Argumenty:
-        - dane: Lista bitów (0 lub 1), które mają być przesłane przez kanał.
+        - liczba_bitow: Długość przesyłanego strumienia.
         Zwraca:
-        - Lista bitów po przesłaniu przez kanał (może zawierać błędy).
+        - Posortowana tablica int64 z indeksami przekłamanych bitów.
         """
-        dane_po_transmisji = []
-        for bit in dane:
-            # Wybierz prawdopodobieństwo błędu na podstawie aktualnego stanu
-            prawd_bledu = self.wysokie_prawd_bledu if self.czy_stan_zly else self.niskie_prawd_bledu
+        najwieksze = max(self.niskie_prawd_bledu, self.wysokie_prawd_bledu)
+        kandydaci = losuj_pozycje_bledow(self.generator, najwieksze, liczba_bitow)
+        losy = self.generator.random((len(kandydaci), 2))
+        przyjete = np.zeros(len(kandydaci), dtype=bool)
+        czy_zly = self.czy_stan_zly
+        poprzednia = 0
+        for i, pozycja in enumerate(kandydaci.tolist()):
+            czy_zly = losy[i, 0] < self._prawd_stanu_zlego_po(pozycja - poprzednia, czy_zly)
+            prawd_bledu = self.wysokie_prawd_bledu if czy_zly else self.niskie_prawd_bledu
+            przyjete[i] = losy[i, 1] * najwieksze < prawd_bledu
+            poprzednia = pozycja
+        # Stan dla następnego bitu po końcu strumienia
+        if liczba_bitow > 0:
+            self.czy_stan_zly = bool(self.generator.random() < self._prawd_stanu_zlego_po(liczba_bitow - poprzednia, czy_zly))
+        return kandydaci[przyjete]
 
-            # Losowo wprowadź błąd na podstawie aktualnego prawdopodobieństwa błędu
-            if random.random() < prawd_bledu:
-                dane_po_transmisji.append(1 - bit)  # Inwersja bitu
+    def pozycje_bledow_wierszy(self, liczba_wierszy, dlugosc):
+        """
+        Tryb rzadki dla transmituj_wiersze: losuje pozycje przekłamanych bitów macierzy, w której każdy
+        wiersz przechodzi przez świeży kanał zaczynający w bieżącym stanie (stan kanału się nie zmienia).
+        Kandydaci losowani są jak w pozycje_bledow dla całej macierzy naraz, a stan w k-tym kandydacie
+        wiersza zależy tylko od stanu w poprzednim kandydacie tego wiersza (lub od stanu początkowego),
+        więc pętla idzie po numerze kandydata w wierszu, dla wszystkich wierszy naraz.
+        Argumenty:
+        - liczba_wierszy, dlugosc: Kształt przesyłanej macierzy.
+        Zwraca:
+        - Posortowana tablica int64 z płaskimi indeksami przekłamanych bitów.
+        """
+        najwieksze = max(self.niskie_prawd_bledu, self.wysokie_prawd_bledu)
+        kandydaci = losuj_pozycje_bledow(self.generator, najwieksze, liczba_wierszy * dlugosc)
+        wiersze, kolumny = np.divmod(kandydaci, dlugosc)
+        # Numer kandydata w jego wierszu (kandydaci są posortowani)
+        numery = np.arange(len(kandydaci)) - np.searchsorted(wiersze, wiersze)
+        losy = self.generator.random((len(kandydaci), 2))
+        czy_zly = np.zeros(len(kandydaci), dtype=bool)
+        for numer in range(int(numery.max()) + 1 if len(kandydaci) else 0):
+            biezace = np.flatnonzero(numery == numer)
+            if numer == 0:
+                prawd_zlego = self._prawd_stanu_zlego_po(kolumny[biezace], self.czy_stan_zly)
             else:
-                dane_po_transmisji.append(bit)  # Bez zmiany
+                prawd_zlego = self._prawd_stanu_zlego_po(kolumny[biezace] - kolumny[biezace - 1], czy_zly[biezace - 1])
+            czy_zly[biezace] = losy[biezace, 0] < prawd_zlego
+        prawd_bledu = np.where(czy_zly, self.wysokie_prawd_bledu, self.niskie_prawd_bledu)
+        return kandydaci[losy[:, 1] * najwieksze < prawd_bledu]
 
-            # Aktualizacja stanu (przejścia między "dobrym" i "złym" stanem)
-            if self.czy_stan_zly:
-                # Przejście ze "złego" do "dobrego" stanu
-                if random.random() < self.przejscie_zly_na_dobry:
-                    self.czy_stan_zly = False
-            else:
-                # Przejście z "dobrego" do "złego" stanu
-                if random.random() < self.przejscie_dobry_na_zly:
-                    self.czy_stan_zly = True
+    def _dlugosci_odcinkow(self, prawd_wyjscia, liczba, limit):
+        """
+        Losuje długości pobytów w stanie, z którego wychodzi się z prawdopodobieństwem prawd_wyjscia.
+        Przy zerowym prawdopodobieństwie wyjścia stan trwa do końca strumienia (limit bitów).
+        """
+        if prawd_wyjscia <= 0:
+            return np.full(liczba, limit, dtype=np.int64)
+        return self.generator.geometric(prawd_wyjscia, liczba)
+
+    def stany(self, liczba_bitow):
+        """
+        Losuje przebieg stanów kanału jako geometryczne długości pobytów w stanie "dobrym" i "złym",
+        zaczynając od bieżącego stanu. Stan na końcu strumienia zapisywany jest w czy_stan_zly.
+        Argumenty:
+        - liczba_bitow: Długość przesyłanego strumienia.
+        Zwraca:
+        - Tablica bool długości liczba_bitow (True = stan "zły" podczas przesyłania bitu).
+        """
+        potrzebne = liczba_bitow + 1  # +1, żeby poznać stan dla następnego wywołania
+        wyjscie_z_obecnego, wyjscie_z_drugiego = self.przejscie_dobry_na_zly, self.przejscie_zly_na_dobry
+        if self.czy_stan_zly:
+            wyjscie_z_obecnego, wyjscie_z_drugiego = wyjscie_z_drugiego, wyjscie_z_obecnego
+        # Średnia długość pary pobytów (obecny + drugi stan) wyznacza rozmiar jednej porcji losowań
+        dlugosc_pary = sum(1.0 / p if p > 0 else potrzebne for p in (wyjscie_z_obecnego, wyjscie_z_drugiego))
+        liczba_par = max(1, int(1.1 * potrzebne / dlugosc_pary) + 4)
+
+        dlugosci = []
+        razem = 0
+        while razem < potrzebne:
+            porcja = np.empty(2 * liczba_par, dtype=np.int64)
+            porcja[0::2] = self._dlugosci_odcinkow(wyjscie_z_obecnego, liczba_par, potrzebne)
+            porcja[1::2] = self._dlugosci_odcinkow(wyjscie_z_drugiego, liczba_par, potrzebne)
+            dlugosci.append(porcja)
+            razem += int(porcja.sum())
+        dlugosci = np.concatenate(dlugosci)
+
+        # Odcinki na przemian: stan obecny, stan przeciwny, ...
+        wartosci = np.zeros(len(dlugosci), dtype=bool)
+        wartosci[1::2] = True
+        if self.czy_stan_zly:
+            wartosci = ~wartosci
+        przebieg = np.repeat(wartosci, dlugosci)[:potrzebne]
+        self.czy_stan_zly = bool(przebieg[-1])
+        return przebieg[:-1]
+
+    def maska_bledow(self, liczba_bitow):
+        """
+        Losuje maskę błędów dla ciągłego strumienia: przebieg stanów zamieniany jest
+        na wektor prawdopodobieństw błędu, a wszystkie błędy losowane są naraz.
+        Argumenty:
+        - liczba_bitow: Długość przesyłanego strumienia.
+        Zwraca:
+        - Tablica uint8, w której 1 oznacza bit przekłamany przez kanał.
+        """
+        if self.czy_rzadki():
+            maska = np.zeros(liczba_bitow, dtype=np.uint8)
+            maska[self.pozycje_bledow(liczba_bitow)] = 1
+            return maska
+        prawd_bledu = np.where(self.stany(liczba_bitow), self.wysokie_prawd_bledu, self.niskie_prawd_bledu)
+        return (self.generator.random(liczba_bitow) < prawd_bledu).astype(np.uint8)
+
+    def transmituj_tablice(self, dane):
+        """
+        Przesyła tablicę bitów przez kanał Gilberta-Elliotta jako jeden ciągły strumień.
+        Stan kanału przechodzi na kolejne wywołania.
+        Argumenty:
+        - dane: Tablica NumPy bitów (0 lub 1) o dowolnym kształcie.
+        Zwraca:
+        - Tablica uint8 tego samego kształtu po przesłaniu przez kanał.
+        """
+        dane = np.asarray(dane, dtype=np.uint8)
+        if self.czy_rzadki():
+            wynik = dane.copy()
+            wynik.reshape(-1)[self.pozycje_bledow(wynik.size)] ^= 1
+            return wynik
+        return dane ^ self.maska_bledow(dane.size).reshape(dane.shape)
+
+    def transmituj_slowa(self, slowa, strumien=False, przeplot=None, losy=None):
+        """
+        Przesyła macierz słów kodowych, opcjonalnie z przeplotem między koderem a kanałem.
+        Bez strumienia każde słowo (lub ramka przeplotu) przechodzi przez świeży kanał
+        (transmituj_wiersze); w trybie strumienia wszystkie przechodzą kolejno przez ten kanał
+        jako jeden ciągły strumień (transmituj_tablice), więc paczki błędów przechodzą między słowami.
+        Argumenty:
+        - slowa: Tablica NumPy o kształcie (N, L), jedno słowo kodowe w wierszu.
+        - strumien: Czy przesłać słowa jednym ciągłym strumieniem.
+        - przeplot: Obiekt z metodami przeplataj/rozplataj (np. z Kody.Przeplot) lub None.
+        - losy: Opcjonalne liczby losowe (2, N, L) dla transmituj_wiersze (nie w trybie strumienia);
+          z przeplotem ramki biorą kolejne losy słów w kolejności nadawania.
+        Zwraca:
+        - Tablica uint8 (N, L) po przesłaniu przez kanał (i rozpleceniu).
+        """
+        if strumien and losy is not None:
+            raise ValueError("Wspólne liczby losowe nie są obsługiwane w trybie strumienia.")
+        ramki = przeplot.przeplataj(slowa) if przeplot is not None else np.asarray(slowa, dtype=np.uint8)
+        if losy is not None and przeplot is not None:
+            losy = self._losy_ramek(losy, ramki.shape)
+        odebrane = self.transmituj_tablice(ramki) if strumien else self.transmituj_wiersze(ramki, losy)
+        return przeplot.rozplataj(odebrane, len(slowa)) if przeplot is not None else odebrane
+
+    def _losy_ramek(self, losy, ksztalt):
+        """
+        Układa losy słów (2, N, L) w ramki o kształcie ksztalt: ramki biorą kolejne losy w kolejności
+        nadawania, a brakujące (ramki dłuższe o bity wypełnienia) losowane są z generatora kanału.
+        """
+        plaskie = np.asarray(losy).reshape(2, -1)
+        potrzebne = ksztalt[0] * ksztalt[1]
+        if plaskie.shape[1] < potrzebne:
+            plaskie = np.concatenate([plaskie, self.generator.random((2, potrzebne - plaskie.shape[1]))], axis=1)
+        return plaskie[:, :potrzebne].reshape((2,) + tuple(ksztalt))
+
+    def transmituj_wiersze(self, dane, losy=None):
+        """
+        Przesyła każdy wiersz macierzy przez osobny, świeży kanał (jak nowy obiekt dla każdej wiadomości),
+        zaczynający w bieżącym stanie tego kanału. Łańcuch stanów jest krokowany kolumna po kolumnie
+        dla wszystkich wierszy naraz, więc koszt zależy od długości wiersza, a nie od liczby wierszy.
+        W trybie rzadkim (bez losów) losowane są tylko pozycje błędów (pozycje_bledow_wierszy),
+        więc koszt zależy od liczby błędów.
+        Argumenty:
+        - dane: Tablica NumPy o kształcie (N, L), jedna wiadomość w wierszu.
+        - losy: Opcjonalne liczby losowe z [0, 1) o kształcie (2, N, L): losy[0] decydują o błędach
+          (błąd, gdy los < prawd_bledu stanu), a losy[1] o przejściach stanów. Przy tych samych
+          losach[0] kanał w stanie "dobrym" przekłamuje te same bity co KanalBSC z niskie_prawd_bledu.
+        Zwraca:
+        - Tablica uint8 (N, L) po przesłaniu przez kanał.
+        """
+        dane = np.asarray(dane, dtype=np.uint8)
+        liczba_wierszy, dlugosc = dane.shape
+        if losy is None and self.czy_rzadki():
+            wynik = dane.copy()
+            wynik.reshape(-1)[self.pozycje_bledow_wierszy(liczba_wierszy, dlugosc)] ^= 1
+            return wynik
+        if losy is None:
+            losy = self.generator.random((2, liczba_wierszy, dlugosc))
+        maska = np.empty(dane.shape, dtype=np.uint8)
+        czy_zly = np.full(liczba_wierszy, self.czy_stan_zly)
+        for j in range(dlugosc):
+            prawd_bledu = np.where(czy_zly, self.wysokie_prawd_bledu, self.niskie_prawd_bledu)
+            maska[:, j] = losy[0, :, j] < prawd_bledu
+            prawd_przejscia = np.where(czy_zly, self.przejscie_zly_na_dobry, self.przejscie_dobry_na_zly)
+            czy_zly ^= losy[1, :, j] < prawd_przejscia
+        return dane ^ maska
+
+    def transmituj_wiersze_istotnie(self, dane, niskie_obciazone, wysokie_obciazone):
+        """
+        Jak transmituj_wiersze, ale błędy losowane są z obciążonymi prawdopodobieństwami błędu
+        w obu stanach (losowanie ważone). Przebieg stanów pochodzi z prawdziwego łańcucha, więc
+        waga wiersza to iloczyn ilorazów P/Q prawdopodobieństw błędu w kolejnych bitach.
+        Argumenty:
+        - dane: Tablica NumPy o kształcie (N, L), jedna wiadomość w wierszu.
+        - niskie_obciazone: Prawdopodobieństwo błędu w stanie "dobrym" kanału obciążonego, z (0, 1).
+        - wysokie_obciazone: Prawdopodobieństwo błędu w stanie "złym" kanału obciążonego, z (0, 1).
+        Zwraca:
+        - Dane po kanale obciążonym (N, L) oraz logarytmy wag dla każdego wiersza (N,).
+        """
+        if not (0 < niskie_obciazone < 1 and 0 < wysokie_obciazone < 1):
+            raise ValueError("Prawdopodobieństwa kanału obciążonego muszą należeć do przedziału (0, 1).")
+        dane = np.asarray(dane, dtype=np.uint8)
+        liczba_wierszy, dlugosc = dane.shape
+        losy = self.generator.random((2, liczba_wierszy, dlugosc))
+        maska = np.empty(dane.shape, dtype=np.uint8)
+        log_wagi = np.zeros(liczba_wierszy)
+        czy_zly = np.full(liczba_wierszy, self.czy_stan_zly)
+        for j in range(dlugosc):
+            prawd_bledu = np.where(czy_zly, self.wysokie_prawd_bledu, self.niskie_prawd_bledu)
+            prawd_obciazone = np.where(czy_zly, wysokie_obciazone, niskie_obciazone)
+            maska[:, j] = losy[0, :, j] < prawd_obciazone
+            log_wagi += log_iloraz_wiarygodnosci(prawd_bledu, prawd_obciazone, maska[:, j])
+            prawd_przejscia = np.where(czy_zly, self.przejscie_zly_na_dobry, self.przejscie_dobry_na_zly)
+            czy_zly ^= losy[1, :, j] < prawd_przejscia
+        return dane ^ maska, log_wagi
 
-        return dane_po_transmisji
+    def transmituj(self, dane):
+        """
+        Przesyła dane przez kanał Gilberta-Elliotta, wprowadzając błędy grupowe.
+        Argumenty:
+        - dane: Lista bitów (0 lub 1), które mają być przesłane przez kanał.
+        Zwraca:
+        - Lista bitów po przesłaniu przez kanał (może zawierać błędy).
+        """
+        return self.transmituj_tablice(dane).tolist()
@@ -0,0 +1,73 @@
+import unittest
+import numpy as np
+from GEliot import KanalGilbertaElliotta
+from StartSymulacji.ModelAnalityczny import rozklad_wag_bledow_ge
+
+# Silnie zróżnicowane stany, żeby pamięć kanału była dobrze widoczna w testach
+PARAMETRY = (0.02, 0.4, 0.1, 0.2)
+
+class TestKanalGilbertaElliotta(unittest.TestCase):
+    def kanal(self, tryb, ziarno, parametry=PARAMETRY):
+        return KanalGilbertaElliotta(*parametry, generator=np.random.default_rng(ziarno), tryb=tryb)
+
+    def assert_zgodny_rozklad(self, wagi, dokladny):
+        empiryczny = np.bincount(wagi, minlength=len(dokladny)) / len(wagi)
+        np.testing.assert_array_less(np.abs(empiryczny - dokladny),
+                                     5 * np.sqrt(dokladny * (1 - dokladny) / len(wagi)) + 1e-9)
+
+    def test_row_weights_match_forward_recursion(self):
+        """Test that per-row error weights of the sparse and dense modes follow the exact G-E distribution."""
+        dlugosc, liczba = 15, 100000
+        dokladny = rozklad_wag_bledow_ge(dlugosc, *PARAMETRY)
+        for ziarno, tryb in enumerate(("rzadki", "gesty")):
+            wagi = self.kanal(tryb, ziarno).transmituj_wiersze(np.zeros((liczba, dlugosc), dtype=np.uint8)).sum(axis=1)
+            self.assert_zgodny_rozklad(wagi, dokladny)
+
+    def test_row_weights_from_bad_state(self):
+        """Test that fresh per-row channels start in the current channel state."""
+        dlugosc, liczba = 15, 50000
+        dokladny = rozklad_wag_bledow_ge(dlugosc, *PARAMETRY, czy_stan_zly=True)
+        for ziarno, tryb in enumerate(("rzadki", "gesty")):
+            kanal = self.kanal(tryb, ziarno)
+            kanal.czy_stan_zly = True
+            wagi = kanal.transmituj_wiersze(np.zeros((liczba, dlugosc), dtype=np.uint8)).sum(axis=1)
+            self.assert_zgodny_rozklad(wagi, dokladny)
+            self.assertTrue(kanal.czy_stan_zly)
+
+    def test_stream_stationary_error_rate(self):
+        """Test that a long stream in either mode has the stationary error rate."""
+        niskie, wysokie, dobry_na_zly, zly_na_dobry = PARAMETRY
+        pi_zly = dobry_na_zly / (dobry_na_zly + zly_na_dobry)
+        oczekiwane = (1 - pi_zly) * niskie + pi_zly * wysokie
+        dlugosc = 1_000_000
+        for ziarno, tryb in enumerate(("rzadki", "gesty")):
+            maska = self.kanal(tryb, ziarno).maska_bledow(dlugosc)
+            # Odcinki o średniej długości ~10 bitów: zapas na skorelowane błędy
+            self.assertLess(abs(maska.mean() - oczekiwane), 0.005, tryb)
+
+    def test_state_carries_over_deterministic(self):
+        """Test that the state reached at the end of a stream is the state of the next call."""
+        for tryb in ("rzadki", "gesty"):
+            kanal = self.kanal(tryb, 0, parametry=(0.0, 1.0, 1.0, 0.0))
+            np.testing.assert_array_equal(kanal.maska_bledow(1), [0])
+            self.assertTrue(kanal.czy_stan_zly)
+            np.testing.assert_array_equal(kanal.maska_bledow(5), np.ones(5))
+
+    def test_state_carries_over_between_calls(self):
+        """Test that two one-bit calls on one channel have the joint error probability of one two-bit stream."""
+        parametry = (0.1, 0.9, 0.5, 0.1)
+        niskie, wysokie, dobry_na_zly, _ = parametry
+        # Pierwszy bit w stanie dobrym, drugi w stanie wylosowanym po jednym przejściu
+        oczekiwane = niskie * (dobry_na_zly * wysokie + (1 - dobry_na_zly) * niskie)
+        liczba = 30000
+        for ziarno, tryb in enumerate(("rzadki", "gesty")):
+            kanal = self.kanal(tryb, ziarno, parametry)
+            oba = 0
+            for _ in range(liczba):
+                kanal.czy_stan_zly = False
+                pierwszy = kanal.maska_bledow(1)[0]
+                oba += int(pierwszy & kanal.maska_bledow(1)[0])
+            self.assertLess(abs(oba / liczba - oczekiwane), 5 * np.sqrt(oczekiwane / liczba), tryb)
+
+if __name__ == '__main__':
+    unittest.main()
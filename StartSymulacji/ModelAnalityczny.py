@@ -0,0 +1,279 @@
+from functools import lru_cache
+from math import comb
+import numpy as np
+from Kody.BCH import get_codec, MAX_LUT_PARITY_BITS
+
+# Największa długość słowa kodowego BCH, dla której wszystkie 2^n wzorce błędów są wyliczane dokładnie
+MAKS_N_DOKLADNE = 16
+
+
+def _rozklad_dwumianowy(n, p):
+    """
+    Rozkład liczby błędów w n niezależnych bitach (P(j) dla j = 0..n).
+    """
+    j = np.arange(n + 1)
+    wspolczynniki = np.array([comb(n, i) for i in range(n + 1)], dtype=float)
+    return wspolczynniki * p ** j * (1 - p) ** (n - j)
+
+
+def _splot_potegi(rozklad, wykladnik):
+    """
+    Rozkład sumy wykladnik niezależnych zmiennych o danym rozkładzie.
+    """
+    wynik = np.array([1.0])
+    for _ in range(wykladnik):
+        wynik = np.convolve(wynik, rozklad)
+    return wynik
+
+
+def _jako_slownik(oczekiwane):
+    """
+    Zamienia wektor oczekiwanych liczebności na słownik {liczba błędów: oczekiwana liczba wiadomości}.
+    """
+    return {j: float(wartosc) for j, wartosc in enumerate(oczekiwane) if wartosc > 0}
+
+
+def prawd_bledu_powielania_bsc(p, liczba_powtorzen):
+    """
+    Prawdopodobieństwo błędnego zdekodowania bitu kodem powtórzeniowym w kanale BSC.
+    Przy parzystej liczbie powtórzeń remis dekodowany jest jako 0, więc bit 1 jest wtedy błędny.
+    :param p: Prawdopodobieństwo błędu kanału
+    :param liczba_powtorzen: Liczba powtórzeń każdego bitu
+    :return: Krotka (prawdopodobieństwo błędu dla bitu 0, dla bitu 1)
+    """
+    rozklad = _rozklad_dwumianowy(liczba_powtorzen, p)
+    polowa = liczba_powtorzen / 2
+    wiekszosc = rozklad[np.arange(liczba_powtorzen + 1) > polowa].sum()
+    remis = rozklad[liczba_powtorzen // 2] if liczba_powtorzen % 2 == 0 else 0.0
+    return float(wiekszosc), float(wiekszosc + remis)
+
+
+def rozklad_bledow_powielania_bsc(dane, p, liczba_powtorzen):
+    """
+    Dokładny oczekiwany rozkład liczby błędów na wiadomość dla kodu powtórzeniowego w BSC.
+    :param dane: Macierz wiadomości (N, L)
+    :param p: Prawdopodobieństwo błędu kanału
+    :param liczba_powtorzen: Liczba powtórzeń każdego bitu
+    :return: Wektor oczekiwanych liczb wiadomości z j błędami (j = 0..L)
+    """
+    dane = np.asarray(dane, dtype=np.uint8)
+    dla_zera, dla_jedynki = prawd_bledu_powielania_bsc(p, liczba_powtorzen)
+    prawd_bitow = np.where(dane == 1, dla_jedynki, dla_zera)
+    liczba_wiadomosci, dlugosc = dane.shape
+    # Rozkład Poissona-dwumianowy liczony kolumna po kolumnie dla wszystkich wiadomości naraz
+    rozklad = np.zeros((liczba_wiadomosci, dlugosc + 1))
+    rozklad[:, 0] = 1.0
+    for j in range(dlugosc):
+        q = prawd_bitow[:, j:j + 1]
+        rozklad[:, 1:] = rozklad[:, 1:] * (1 - q) + rozklad[:, :-1] * q
+        rozklad[:, 0] *= 1 - q[:, 0]
+    return rozklad.sum(axis=0)
+
+
+@lru_cache(maxsize=None)
+def _wzorce_bledow_bch(n, k):
+    """
+    Wszystkie 2^n wzorce błędów kodu BCH(n, k) oraz błędy, które dekoder zostawia w bitach wiadomości.
+    Dekoder syndromowy daje ten sam wynik dla każdego nadanego słowa kodowego, więc wystarczy
+    zdekodować wzorce nałożone na słowo zerowe.
+    :return: Krotka (wzorce (2^n, n), błędy wiadomości po dekodowaniu (2^n, k)), obie uint8
+    """
+    if n > MAKS_N_DOKLADNE:
+        raise ValueError(f"Dokładne wyliczenie wymaga n <= {MAKS_N_DOKLADNE}")
+    bch = get_codec(n, k, "lut" if n - k <= MAX_LUT_PARITY_BITS else "galois")
+    wzorce = ((np.arange(1 << n)[:, None] >> np.arange(n - 1, -1, -1)) & 1).astype(np.uint8)
+    return wzorce, bch.dekoduj_batch(wzorce)
+
+
+@lru_cache(maxsize=None)
+def tablica_wag_bch(n, k, pozycje):
+    """
+    Dla kodu BCH(n, k) liczy A[w, j]: liczbę wzorców błędów wagi w, po których dekoder zostawia
+    j błędów w pierwszych pozycje bitach wiadomości.
+    """
+    wzorce, bledy_wiadomosci = _wzorce_bledow_bch(n, k)
+    tablica = np.zeros((n + 1, pozycje + 1), dtype=np.int64)
+    np.add.at(tablica, (wzorce.sum(axis=1), bledy_wiadomosci[:, :pozycje].sum(axis=1)), 1)
+    return tablica
+
+
+def rozklad_bledow_bloku_bch_bsc(p, n, k, pozycje):
+    """
+    Rozkład liczby błędów w pierwszych pozycje bitach wiadomości jednego słowa BCH(n, k) w BSC.
+    Dla n <= MAKS_N_DOKLADNE wynik jest dokładny (sumy dwumianowe po tablicy wag); dla większych
+    kodów stosowane jest przybliżenie dekodera ograniczonej odległości: przy więcej niż t błędach
+    kanału każdy bit wiadomości jest błędny z prawdopodobieństwem j / n.
+    """
+    if n <= MAKS_N_DOKLADNE:
+        w = np.arange(n + 1)
+        prawd_wag = p ** w * (1 - p) ** (n - w)
+        return prawd_wag @ tablica_wag_bch(n, k, pozycje)
+    return _przyblizenie_ograniczonej_odleglosci(_rozklad_dwumianowy(n, p), n, k, pozycje)
+
+
+def _przyblizenie_ograniczonej_odleglosci(rozklad_wag, n, k, pozycje):
+    """
+    Przybliżony rozkład błędów w pierwszych pozycje bitach wiadomości BCH(n, k) z rozkładu wag
+    błędów kanału: do t błędów słowo jest poprawiane, przy j > t każdy bit wiadomości jest
+    błędny z prawdopodobieństwem j / n.
+    """
+    t = get_codec(n, k).bch.t
+    wynik = np.zeros(pozycje + 1)
+    wynik[0] = rozklad_wag[:t + 1].sum()
+    for j in range(t + 1, n + 1):
+        wynik += rozklad_wag[j] * _rozklad_dwumianowy(pozycje, j / n)
+    return wynik
+
+
+def rozklad_bledow_bch_bsc(dlugosc_wiadomosci, liczba_wiadomosci, p, n, k):
+    """
+    Oczekiwany rozkład liczby błędów na wiadomość dla BCH w BSC, przy podziale wiadomości
+    na fragmenty po k bitów (ostatni dopełniony zerami), jak w RejestrMetod.WtyczkaBCH.
+    :return: Wektor oczekiwanych liczb wiadomości z j błędami (j = 0..dlugosc_wiadomosci)
+    """
+    pelne, reszta = divmod(dlugosc_wiadomosci, k)
+    rozklad = _splot_potegi(rozklad_bledow_bloku_bch_bsc(p, n, k, k), pelne)
+    if reszta:
+        rozklad = np.convolve(rozklad, rozklad_bledow_bloku_bch_bsc(p, n, k, reszta))
+    return liczba_wiadomosci * rozklad
+
+
+def wynik_analityczny_bsc(dane, p, liczba_powtorzen, n, k):
+    """
+    Dokładne (oczekiwane) liczby błędów i rozkłady dla powielania i BCH w kanale BSC.
+    :return: Słowniki (incorrect_bits, error_dists) z kluczami 'powielanie' i 'bch'
+    """
+    dane = np.asarray(dane, dtype=np.uint8)
+    liczba_wiadomosci, dlugosc = dane.shape
+    rozklady = {
+        'powielanie': rozklad_bledow_powielania_bsc(dane, p, liczba_powtorzen),
+        'bch': rozklad_bledow_bch_bsc(dlugosc, liczba_wiadomosci, p, n, k)
+    }
+    bledy = {klucz: float(np.arange(len(r)) @ r) for klucz, r in rozklady.items()}
+    return bledy, {klucz: _jako_slownik(r) for klucz, r in rozklady.items()}
+
+
+def parametry_ge(error_prob):
+    """
+    Parametry kanału Gilberta-Elliotta używane we wszystkich symulacjach (RejestrMetod.WtyczkaGE,
+    SymulujBCHEliot, SymulujPowielanieGEliot): (niskie, wysokie, dobry->zły, zły->dobry).
+    Niskie prawdopodobieństwo to error_prob, a wysokie jest 3x większe.
+    """
+    return error_prob, min(3 * error_prob, 1.0), 0.05, 0.1
+
+
+def _macierze_ge(niskie, wysokie, przejscie_dobry_na_zly, przejscie_zly_na_dobry):
+    """
+    Prawdopodobieństwa błędu w stanach (dobry, zły) i macierz przejść P[stan, następny stan].
+    """
+    prawd_bledu = np.array([niskie, wysokie])
+    przejscia = np.array([[1 - przejscie_dobry_na_zly, przejscie_dobry_na_zly],
+                          [przejscie_zly_na_dobry, 1 - przejscie_zly_na_dobry]])
+    return prawd_bledu, przejscia
+
+
+def _przejscia_z_bledami_ge(dlugosc, parametry):
+    """
+    Rekurencja w przód po (stan, liczba błędów) dla dlugosc bitów, osobno dla każdego stanu początkowego.
+    Bit jest przekłamywany zgodnie ze stanem, w którym jest wysyłany, a potem kanał zmienia stan,
+    tak jak w KanalGilbertaElliotta.
+    :return: Tablica T[stan początkowy, stan po ostatnim bicie, liczba błędów]
+    """
+    prawd_bledu, przejscia = _macierze_ge(*parametry)
+    alfa = np.zeros((2, 2, dlugosc + 1))
+    alfa[0, 0, 0] = alfa[1, 1, 0] = 1.0
+    for _ in range(dlugosc):
+        bez_bledu = alfa * (1 - prawd_bledu)[None, :, None]
+        z_bledem = alfa * prawd_bledu[None, :, None]
+        z_bledem = np.concatenate([np.zeros((2, 2, 1)), z_bledem[:, :, :-1]], axis=2)
+        alfa = np.einsum('asj,st->atj', bez_bledu + z_bledem, przejscia)
+    return alfa
+
+
+def rozklad_wag_bledow_ge(dlugosc, niskie, wysokie, przejscie_dobry_na_zly, przejscie_zly_na_dobry,
+                          czy_stan_zly=False):
+    """
+    Dokładny rozkład liczby przekłamanych bitów w słowie długości dlugosc w kanale Gilberta-Elliotta.
+    :param czy_stan_zly: Stan kanału przy pierwszym bicie (domyślnie "dobry", jak dla świeżego kanału)
+    :return: Wektor P(j błędów) dla j = 0..dlugosc
+    """
+    parametry = (niskie, wysokie, przejscie_dobry_na_zly, przejscie_zly_na_dobry)
+    return _przejscia_z_bledami_ge(dlugosc, parametry)[int(czy_stan_zly)].sum(axis=0)
+
+
+def rozklad_bledow_bloku_bch_ge(n, k, pozycje, parametry):
+    """
+    Rozkład liczby błędów w pierwszych pozycje bitach wiadomości słowa BCH(n, k) wysłanego
+    przez świeży kanał Gilberta-Elliotta. W kanale z pamięcią wzorce tej samej wagi nie są
+    jednakowo prawdopodobne, więc prawdopodobieństwo każdego z 2^n wzorców liczone jest
+    rekurencją w przód (wszystkie wzorce naraz). Dla n > MAKS_N_DOKLADNE stosowane jest
+    przybliżenie dekodera ograniczonej odległości na rozkładzie wag z rozklad_wag_bledow_ge.
+    """
+    if n > MAKS_N_DOKLADNE:
+        return _przyblizenie_ograniczonej_odleglosci(rozklad_wag_bledow_ge(n, *parametry), n, k, pozycje)
+    wzorce, bledy_wiadomosci = _wzorce_bledow_bch(n, k)
+    prawd_bledu, przejscia = _macierze_ge(*parametry)
+    alfa = np.zeros((len(wzorce), 2))
+    alfa[:, 0] = 1.0
+    for j in range(n):
+        bit = wzorce[:, j:j + 1]
+        alfa = (alfa * np.where(bit == 1, prawd_bledu, 1 - prawd_bledu)) @ przejscia
+    return np.bincount(bledy_wiadomosci[:, :pozycje].sum(axis=1), weights=alfa.sum(axis=1),
+                       minlength=pozycje + 1)
+
+
+def rozklad_bledow_bch_ge(dlugosc_wiadomosci, liczba_wiadomosci, n, k, parametry):
+    """
+    Oczekiwany rozkład liczby błędów na wiadomość dla BCH w kanale Gilberta-Elliotta,
+    gdy każde słowo kodowe zaczyna w stanie dobrym (jak RejestrMetod.WtyczkaGE bez trybu strumienia).
+    """
+    pelne, reszta = divmod(dlugosc_wiadomosci, k)
+    rozklad = _splot_potegi(rozklad_bledow_bloku_bch_ge(n, k, k, parametry), pelne)
+    if reszta:
+        rozklad = np.convolve(rozklad, rozklad_bledow_bloku_bch_ge(n, k, reszta, parametry))
+    return liczba_wiadomosci * rozklad
+
+
+def rozklad_bledow_powielania_ge(dane, liczba_powtorzen, parametry):
+    """
+    Oczekiwany rozkład liczby błędów na wiadomość dla kodu powtórzeniowego w kanale
+    Gilberta-Elliotta, gdy każda wiadomość zaczyna w stanie dobrym (jak RejestrMetod.WtyczkaGE bez trybu strumienia).
+    Stan kanału łączy kolejne grupy powtórzeń, więc rekurencja biegnie po (stan, liczba
+    błędnie zdekodowanych bitów) grupa po grupie, dla wszystkich wiadomości naraz.
+    """
+    dane = np.asarray(dane, dtype=np.uint8)
+    grupa = _przejscia_z_bledami_ge(liczba_powtorzen, parametry)
+    liczby = np.arange(liczba_powtorzen + 1)
+    # Bit 0 jest błędny przy większości przekłamań, bit 1 także przy remisie (dekodowanym jako 0)
+    blad_dla_bitu = np.stack([2 * liczby > liczba_powtorzen, 2 * liczby >= liczba_powtorzen])
+    # G[bit, stan, następny stan, czy błąd]
+    przejscia_grupy = np.stack([
+        np.stack([grupa[:, :, ~blad].sum(axis=2), grupa[:, :, blad].sum(axis=2)], axis=2)
+        for blad in blad_dla_bitu
+    ])
+    liczba_wiadomosci, dlugosc = dane.shape
+    alfa = np.zeros((liczba_wiadomosci, 2, dlugosc + 1))
+    alfa[:, 0, 0] = 1.0
+    for j in range(dlugosc):
+        g = przejscia_grupy[dane[:, j]]
+        nowa = np.einsum('nsj,nst->ntj', alfa, g[..., 0])
+        nowa[:, :, 1:] += np.einsum('nsj,nst->ntj', alfa[:, :, :-1], g[..., 1])
+        alfa = nowa
+    return alfa.sum(axis=(0, 1))
+
+
+def wynik_analityczny_ge(dane, p, liczba_powtorzen, n, k):
+    """
+    Dokładne (oczekiwane) liczby błędów i rozkłady dla powielania i BCH w kanale Gilberta-Elliotta
+    o parametrach parametry_ge(p).
+    :return: Słowniki (incorrect_bits, error_dists) z kluczami 'powielanie_ge' i 'bch_ge'
+    """
+    dane = np.asarray(dane, dtype=np.uint8)
+    liczba_wiadomosci, dlugosc = dane.shape
+    parametry = parametry_ge(p)
+    rozklady = {
+        'powielanie_ge': rozklad_bledow_powielania_ge(dane, liczba_powtorzen, parametry),
+        'bch_ge': rozklad_bledow_bch_ge(dlugosc, liczba_wiadomosci, n, k, parametry)
+    }
+    bledy = {klucz: float(np.arange(len(r)) @ r) for klucz, r in rozklady.items()}
+    return bledy, {klucz: _jako_slownik(r) for klucz, r in rozklady.items()}
@@ -0,0 +1,70 @@
+import unittest
+from math import comb
+import numpy as np
+from ModelAnalityczny import (prawd_bledu_powielania_bsc, rozklad_bledow_powielania_bsc, tablica_wag_bch,
+                              rozklad_bledow_bloku_bch_bsc, rozklad_wag_bledow_ge, rozklad_bledow_bloku_bch_ge,
+                              parametry_ge)
+from Kody.BCH import get_codec
+from Przesyl.GEliot import KanalGilbertaElliotta
+from Start import simulate_shard, channel_generators, make_result, run_analytic, compare_with_analytic
+
+def dwumianowy(n, p):
+    return np.array([comb(n, j) * p ** j * (1 - p) ** (n - j) for j in range(n + 1)])
+
+class TestModelAnalityczny(unittest.TestCase):
+    def test_repetition_bsc(self):
+        """Test the repetition decoding error against the majority-vote binomial sums."""
+        p = 0.1
+        self.assertAlmostEqual(prawd_bledu_powielania_bsc(p, 3)[0], 3 * p ** 2 * (1 - p) + p ** 3)
+        # Parzysta liczba powtórzeń: remis dekodowany jako 0, więc psuje tylko bit 1
+        zero, jeden = prawd_bledu_powielania_bsc(p, 2)
+        self.assertAlmostEqual(zero, p ** 2)
+        self.assertAlmostEqual(jeden, p ** 2 + 2 * p * (1 - p))
+        q = prawd_bledu_powielania_bsc(p, 3)[0]
+        np.testing.assert_allclose(rozklad_bledow_powielania_bsc(np.zeros((4, 6)), p, 3), 4 * dwumianowy(6, q))
+
+    def test_bch_bsc(self):
+        """Test that the BCH weight table covers every pattern and corrects up to t errors."""
+        n, k = 15, 5
+        t = get_codec(n, k).bch.t
+        tablica = tablica_wag_bch(n, k, k)
+        np.testing.assert_array_equal(tablica.sum(axis=1), [comb(n, w) for w in range(n + 1)])
+        np.testing.assert_array_equal(tablica[:t + 1, 1:], 0)
+        p = 0.05
+        rozklad = rozklad_bledow_bloku_bch_bsc(p, n, k, k)
+        self.assertAlmostEqual(rozklad.sum(), 1.0)
+        self.assertGreaterEqual(rozklad[0], dwumianowy(n, p)[:t + 1].sum())
+
+    def test_ge_without_memory_is_binomial(self):
+        """Test that a G-E channel with equal error probabilities gives the binomial weights."""
+        np.testing.assert_allclose(rozklad_wag_bledow_ge(15, 0.1, 0.1, 0.05, 0.1), dwumianowy(15, 0.1))
+
+    def test_ge_matches_monte_carlo(self):
+        """Test the forward recursion against a Monte Carlo estimate of fresh G-E channels."""
+        parametry = parametry_ge(0.05)
+        liczba = 200000
+        kanal = KanalGilbertaElliotta(*parametry, generator=np.random.default_rng(0))
+        wagi = kanal.transmituj_wiersze(np.zeros((liczba, 15), dtype=np.uint8)).sum(axis=1)
+        empiryczny = np.bincount(wagi, minlength=16) / liczba
+        dokladny = rozklad_wag_bledow_ge(15, *parametry)
+        np.testing.assert_array_less(np.abs(empiryczny - dokladny), 5 * np.sqrt(dokladny * (1 - dokladny) / liczba) + 1e-9)
+        # Słowo BCH: rozkład błędów wiadomości po dekodowaniu
+        bch = get_codec(15, 5, "lut")
+        slowa = np.zeros((liczba, 15), dtype=np.uint8)
+        bledy = bch.dekoduj_batch(kanal.transmituj_wiersze(slowa)).sum(axis=1)
+        empiryczny = np.bincount(bledy, minlength=6) / liczba
+        dokladny = rozklad_bledow_bloku_bch_ge(15, 5, 5, parametry)
+        np.testing.assert_array_less(np.abs(empiryczny - dokladny), 5 * np.sqrt(dokladny * (1 - dokladny) / liczba) + 1e-9)
+
+    def test_consistent_simulation_has_small_z(self):
+        """Test that a simulation of the analytic model gives small compare_with_analytic z-scores."""
+        dane = np.random.default_rng(1).integers(0, 2, (3000, 20), dtype=np.uint8)
+        for p in (0.02, 0.1):
+            czesciowy = simulate_shard(dane, p, 3, channel_generators(5, p, 0))
+            wynik = make_result(p, 3, czesciowy['total_bits'], czesciowy['incorrect_bits'], czesciowy['error_dists'])
+            rozbieznosci = compare_with_analytic([wynik], [run_analytic(p, 3, dane)], z_threshold=0.0)
+            self.assertEqual(len(rozbieznosci), 4)
+            self.assertTrue(all(abs(z) < 4 for *_, z in rozbieznosci), rozbieznosci)
+
+if __name__ == '__main__':
+    unittest.main()
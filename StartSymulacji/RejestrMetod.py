@@ -0,0 +1,221 @@
+import numpy as np
+from Kody.PowielanieBitow import PowielanieBitow
+from ObslugaDanych.LiczenieBledow import zlicz_bledy_wierszami, zlicz_bledy_spakowane
+from ObslugaDanych.SpakowaneBity import spakuj
+from Przesyl.BSC import KanalBSC
+from Przesyl.GEliot import KanalGilbertaElliotta
+from StartSymulacji.ModelAnalityczny import parametry_ge
+
+# Zarejestrowane wtyczki kodów i kanałów, według klucza
+KODEKI = {}
+KANALY = {}
+
+
+def zarejestruj_kodek(klasa):
+    """
+    Dekorator rejestrujący klasę kodu. Klasa ma atrybuty klucz, kolumna (przedrostek kolumn wyników),
+    etykieta i spakowane (czy obsługuje słowa uint64), konstruktor przyjmujący słownik parametrów
+    przebiegu ('repetitions', 'bch') oraz metody wsadowe:
+    - dlugosc_slowa(dlugosc_wiadomosci), slowa_na_wiadomosc(dlugosc_wiadomosci),
+    - koduj(dane, spakowane) -> słowa kodowe kolejnych wiadomości, jedno w wierszu,
+    - bledy(dane, odebrane, spakowane) -> liczba błędów w każdej wiadomości po dekodowaniu.
+    """
+    KODEKI[klasa.klucz] = klasa
+    return klasa
+
+
+def zarejestruj_kanal(klasa):
+    """
+    Dekorator rejestrujący klasę kanału. Klasa ma atrybuty klucz, przyrostek (klucza metody),
+    przyrostek_kolumny, etykieta, spakowane i z_pamiecia (czy przeplot ma sens), konstruktor
+    (error_prob, generator) oraz metody wsadowe:
+    - transmituj(slowa, dlugosc_slowa, spakowane, losy, strumien, przeplot) -> słowa po kanale,
+    - transmituj_istotnie(slowa, prawd_obciazone) -> (słowa po kanale obciążonym, log-wagi wierszy).
+    """
+    KANALY[klasa.klucz] = klasa
+    return klasa
+
+
+class Metoda:
+    """
+    Para (kod, kanał) symulowana razem, opcjonalnie z przeplotem między koderem a kanałem.
+    Z rejestru wyprowadzane są klucz metody (np. 'bch_ge_przeplot'), klucz kolumny stopy błędów
+    (np. 'bch_error_rate_geliot_interleaved') i etykieta (np. 'BCH G-E interleaved').
+    """
+    def __init__(self, kodek, kanal, przeplot=False):
+        if kodek not in KODEKI:
+            raise ValueError(f"Nieznany kod: {kodek}")
+        if kanal not in KANALY:
+            raise ValueError(f"Nieznany kanał: {kanal}")
+        if przeplot and not KANALY[kanal].z_pamiecia:
+            raise ValueError(f"Przeplot nie ma sensu w kanale bez pamięci: {kanal}")
+        self.kodek = kodek
+        self.kanal = kanal
+        self.przeplot = bool(przeplot)
+        przyrostek = '_przeplot' if przeplot else ''
+        self.klucz = f"{kodek}{KANALY[kanal].przyrostek}{przyrostek}"
+        self.klucz_stopy = (f"{KODEKI[kodek].kolumna}_error_rate{KANALY[kanal].przyrostek_kolumny}"
+                            f"{'_interleaved' if przeplot else ''}")
+        self.etykieta = f"{KODEKI[kodek].etykieta} {KANALY[kanal].etykieta}{' interleaved' if przeplot else ''}"
+
+    def jako_krotka(self):
+        return self.kodek, self.kanal, self.przeplot
+
+
+def znajdz_metode(klucz):
+    """
+    Zwraca metodę o danym kluczu spośród wszystkich kombinacji zarejestrowanych kodów i kanałów.
+    Rzuca ValueError, jeśli żadna nie pasuje.
+    """
+    for kodek in KODEKI:
+        for kanal, klasa in KANALY.items():
+            for przeplot in ((False, True) if klasa.z_pamiecia else (False,)):
+                metoda = Metoda(kodek, kanal, przeplot)
+                if metoda.klucz == klucz:
+                    return metoda
+    raise ValueError(f"Nieznana metoda: {klucz}")
+
+
+def zlicz_bledy_fragmentow_spakowanych(fragmenty, odkodowane, dlugosc_wiadomosci, k):
+    """
+    Liczy błędy w każdej wiadomości między spakowanymi fragmentami k-bitowymi (format
+    ObslugaDanych.SpakowaneBity, fragmenty kolejnych wiadomości jeden po drugim) a ich odkodowanymi
+    wersjami, pomijając dopełnienie ostatniego fragmentu każdej wiadomości.
+    :return: Tablica int64 z liczbą błędów w każdej wiadomości
+    """
+    fragmenty_na_wiadomosc = -(-dlugosc_wiadomosci // k)
+    uzyteczne = np.minimum(k, dlugosc_wiadomosci - k * np.arange(fragmenty_na_wiadomosc))
+    maski = spakuj(np.arange(k) < uzyteczne[:, None])
+    ksztalt = (-1, fragmenty_na_wiadomosc, fragmenty.shape[1])
+    return zlicz_bledy_spakowane(fragmenty.reshape(ksztalt) & maski,
+                                 odkodowane.reshape(ksztalt) & maski).sum(axis=1)
+
+
+@zarejestruj_kodek
+class WtyczkaPowielania:
+    """
+    Powielanie bitów: jedno słowo kodowe długości L * repetitions na wiadomość.
+    """
+    klucz = 'powielanie'
+    kolumna = 'duplicating'
+    etykieta = 'Duplicating'
+    spakowane = False
+
+    def __init__(self, parametry):
+        self.powielanie = PowielanieBitow(liczba_powtorzen=parametry['repetitions'])
+
+    def dlugosc_slowa(self, dlugosc_wiadomosci):
+        return dlugosc_wiadomosci * self.powielanie.liczba_powtorzen
+
+    def slowa_na_wiadomosc(self, dlugosc_wiadomosci):
+        return 1
+
+    def koduj(self, dane, spakowane=False):
+        return self.powielanie.koduj_tablice(dane)
+
+    def bledy(self, dane, odebrane, spakowane=False):
+        return zlicz_bledy_wierszami(dane, self.powielanie.dekoduj_tablice(odebrane))
+
+
+@zarejestruj_kodek
+class WtyczkaBCH:
+    """
+    Kod BCH przebiegu: wiadomość dzielona jest na fragmenty po k bitów (ostatni dopełniony zerami),
+    a każdy fragment to jedno słowo kodowe długości n. Słowa mogą być spakowane do uint64, po jednym
+    słowie kodowym w wierszu słów uint64 (słowa kodowe nie są pakowane jedno za drugim), a fragmenty
+    są przed spakowaniem składane jako bajty, więc oszczędność pamięci dla krótkich kodów jest niewielka.
+    """
+    klucz = 'bch'
+    kolumna = 'bch'
+    etykieta = 'BCH'
+    spakowane = True
+
+    def __init__(self, parametry):
+        self.bch = parametry['bch']
+
+    def dlugosc_slowa(self, dlugosc_wiadomosci):
+        return self.bch.n
+
+    def slowa_na_wiadomosc(self, dlugosc_wiadomosci):
+        return -(-dlugosc_wiadomosci // self.bch.k)
+
+    def _fragmenty(self, dane, spakowane):
+        dlugosc = dane.shape[1]
+        fragmenty = np.zeros((len(dane), self.slowa_na_wiadomosc(dlugosc) * self.bch.k), dtype=np.uint8)
+        fragmenty[:, :dlugosc] = dane
+        fragmenty = fragmenty.reshape(-1, self.bch.k)
+        return spakuj(fragmenty) if spakowane else fragmenty
+
+    def koduj(self, dane, spakowane=False):
+        fragmenty = self._fragmenty(dane, spakowane)
+        return self.bch.koduj_spakowane(fragmenty) if spakowane else self.bch.koduj_batch(fragmenty)
+
+    def bledy(self, dane, odebrane, spakowane=False):
+        dlugosc = dane.shape[1]
+        if spakowane:
+            return zlicz_bledy_fragmentow_spakowanych(self._fragmenty(dane, True), self.bch.dekoduj_spakowane(odebrane),
+                                                      dlugosc, self.bch.k)
+        odkodowane = self.bch.dekoduj_batch(odebrane).reshape(len(dane), -1)[:, :dlugosc]
+        return zlicz_bledy_wierszami(dane, odkodowane)
+
+
+@zarejestruj_kanal
+class WtyczkaBSC:
+    """
+    Kanał BSC o prawdopodobieństwie błędu error_prob; przesyła też słowa spakowane do uint64.
+    """
+    klucz = 'bsc'
+    przyrostek = ''
+    przyrostek_kolumny = ''
+    etykieta = 'BSC'
+    spakowane = True
+    z_pamiecia = False
+
+    def __init__(self, error_prob, generator):
+        self.kanal = KanalBSC(prawd_bledu=error_prob, generator=generator)
+
+    def transmituj(self, slowa, dlugosc_slowa, spakowane=False, losy=None, strumien=False, przeplot=None):
+        # Kanał bez pamięci: strumień i świeże kanały dla słów dają ten sam rozkład
+        losy_bledow = None if losy is None else losy[0]
+        if spakowane:
+            return self.kanal.transmituj_spakowane_slowa(slowa, dlugosc_slowa, losy_bledow)
+        return self.kanal.transmituj_tablice(slowa, losy_bledow)
+
+    def transmituj_istotnie(self, slowa, prawd_obciazone):
+        return self.kanal.transmituj_istotnie(slowa, prawd_obciazone)
+
+
+@zarejestruj_kanal
+class WtyczkaGE:
+    """
+    Kanał Gilberta-Elliotta o parametrach parametry_ge(error_prob); każde słowo (lub ramka przeplotu)
+    przechodzi przez świeży kanał, a w trybie strumienia wszystkie przez jeden.
+    """
+    klucz = 'ge'
+    przyrostek = '_ge'
+    przyrostek_kolumny = '_geliot'
+    etykieta = 'G-E'
+    spakowane = False
+    z_pamiecia = True
+
+    def __init__(self, error_prob, generator):
+        niskie, wysokie, dobry_na_zly, zly_na_dobry = parametry_ge(error_prob)
+        self.kanal = KanalGilbertaElliotta(
+            niskie_prawd_bledu=niskie,
+            wysokie_prawd_bledu=wysokie,
+            przejscie_dobry_na_zly=dobry_na_zly,
+            przejscie_zly_na_dobry=zly_na_dobry,
+            generator=generator
+        )
+
+    def transmituj(self, slowa, dlugosc_slowa, spakowane=False, losy=None, strumien=False, przeplot=None):
+        return self.kanal.transmituj_slowa(slowa, strumien, przeplot, losy)
+
+    def transmituj_istotnie(self, slowa, prawd_obciazone):
+        # W stanie złym obciążamy jak w parametry_ge, ale nie powyżej 0.5
+        wysokie_obciazone = min(parametry_ge(prawd_obciazone)[1], 0.5)
+        return self.kanal.transmituj_wiersze_istotnie(slowa, prawd_obciazone, wysokie_obciazone)
+
+
+# Metody symulowane, gdy przebieg nie wybiera innych (kolejność kolumn w wynikach)
+DOMYSLNE_METODY = (Metoda('powielanie', 'bsc'), Metoda('bch', 'bsc'), Metoda('powielanie', 'ge'), Metoda('bch', 'ge'))
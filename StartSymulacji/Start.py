@@ -1,187 +1,854 @@
 from ObslugaDanych.OdczytajDane import OdczytDanych
-from StartSymulacji import SymulacjaDlaPowielania
-from StartSymulacji import SymulacjaDlaBCH
-from StartSymulacji import SymulacjaBCHGEliot
-from StartSymulacji import SymulacjaDlaPowielaniaGEliot
-from config import BCH_K
+from ObslugaDanych.LiczenieBledow import rozklad_bledow
+from ObslugaDanych.MagazynWynikow import MagazynWynikow, CALY_PUNKT
+from ObslugaDanych.PamiecWynikow import PamiecWynikow, skrot_danych
+from StartSymulacji.RejestrMetod import KODEKI, KANALY, Metoda, znajdz_metode, DOMYSLNE_METODY
+from StartSymulacji.ModelAnalityczny import wynik_analityczny_bsc, wynik_analityczny_ge, parametry_ge
+from Kody.BCH import get_codec
+from Kody.Przeplot import utworz_przeplot
+from config import (BCH_N, BCH_K, BCH_DECODER, RESULT_CACHE_DIR, RESULT_CACHE_MAX_BYTES, RESULT_CACHE_MAX_AGE_DAYS,
+                    SIMULATION_SEED)
 import csv
+import math
 from datetime import datetime
 import os
+import sys
+import zlib
 import multiprocessing as mp
+from multiprocessing import shared_memory
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
+from functools import partial
+from statistics import NormalDist
 from tqdm import tqdm
 from collections import defaultdict
 import numpy as np
 
-def count_errors_in_sequence(original, decoded):
-    """Count number of errors in a single sequence"""
-    if len(original) != len(decoded):
-        raise ValueError(f"Length mismatch: original={len(original)}, decoded={len(decoded)}")
-    return sum(1 for i in range(len(original)) if original[i] != decoded[i])
+def rate_key(method_key):
+    """Post-decoding error rate key of a method in the result dict, e.g. bch_ge -> bch_error_rate_geliot"""
+    return znajdz_metode(method_key).klucz_stopy
 
-def prepare_data_for_bch(data):
+def resolve_methods(methods=None, interleaver=None):
     """
-    Prepare data for BCH encoding by splitting into chunks of size BCH_K.
-    If the last chunk is incomplete, it's padded with zeros.
+    Methods to simulate as a tuple of (codec, channel, interleaved) tuples, keys of the
+    StartSymulacji.RejestrMetod registry, e.g. (('bch', 'bsc', False), ('bch', 'ge', True)).
+    By default the methods of DOMYSLNE_METODY, plus BCH over G-E through the interleaver
+    (the bch_ge_przeplot method) when an interleaver is given.
+    Raises ValueError for unknown codecs or channels and for interleaved methods without an interleaver.
     """
-    chunks = []
-    for i in range(0, len(data), BCH_K):
-        chunk = data[i:i + BCH_K]
-        # Pad last chunk with zeros if needed
-        if len(chunk) < BCH_K:
-            chunk = chunk + [0] * (BCH_K - len(chunk))
-        chunks.append(chunk)
-    return chunks
+    if methods is None:
+        methods = [method.jako_krotka() for method in DOMYSLNE_METODY]
+        if interleaver is not None:
+            methods.append(('bch', 'ge', True))
+    methods = tuple(Metoda(*method).jako_krotka() for method in methods)
+    if interleaver is None and any(interleaved for _, _, interleaved in methods):
+        raise ValueError("Interleaved methods need an interleaver description")
+    return methods
 
-def run_simulation(params):
+# Bumped whenever the results of a configuration change (result dicts or random streams),
+# so stale entries of the result cache and result store are not reused
+RESULT_FORMAT_VERSION = 3
+
+# Result CSV columns always written, in order (those of the default methods); extra keys
+# (e.g. other methods or CI bounds) follow them
+RESULT_FIELDNAMES = (['error_prob', 'repetitions', 'total_bits']
+                     + [f'incorrect_bits_{method.klucz}' for method in DOMYSLNE_METODY]
+                     + [method.klucz_stopy for method in DOMYSLNE_METODY])
+
+def wilson_interval(errors, trials, confidence=0.95):
+    """Wilson score interval (low, high) for an error rate of errors out of trials"""
+    if trials == 0:
+        return 0.0, 1.0
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    rate = errors / trials
+    denominator = 1 + z * z / trials
+    center = (rate + z * z / (2 * trials)) / denominator
+    half_width = z * math.sqrt(rate * (1 - rate) / trials + z * z / (4 * trials * trials)) / denominator
+    return max(0.0, center - half_width), min(1.0, center + half_width)
+
+def load_dataset_matrix(input_file, message_length=None):
     """
-    Run a single simulation with given parameters.
-    params is a tuple of (error_prob, repetitions, input_file)
+    Load every message of input_file as one uint8 matrix of shape (messages, bits).
+    The file format follows OdczytDanych (text, packed .bin or memory-mapped .u8);
+    memory-mapped files need message_length and are returned without being read into RAM.
+    Raises ValueError if the messages differ in length.
     """
-    error_prob, repetitions, input_file = params
-    
+    return OdczytDanych(input_file, dlugosc_wiadomosci=message_length).odczytaj_macierz()
+
+def make_result(error_prob, repetitions, total_bits, incorrect_bits, error_dists):
+    """
+    Build the result dict of a single simulation.
+    incorrect_bits and error_dists are keyed by method (e.g. powielanie, bch, powielanie_ge, bch_ge,
+    bch_ge_przeplot); every method gets incorrect_bits_<method>, its error rate column (see
+    rate_key) and error_dist_<method>.
+    """
+    result = {
+        'error_prob': error_prob,
+        'repetitions': repetitions,
+        'total_bits': total_bits
+    }
+    for method_key, errors in incorrect_bits.items():
+        result[f'incorrect_bits_{method_key}'] = errors
+    for method_key, errors in incorrect_bits.items():
+        result[rate_key(method_key)] = errors/total_bits
+    for method_key, dist in error_dists.items():
+        result[f'error_dist_{method_key}'] = dict(dist)
+    return result
+
+def group_messages_by_length(messages):
+    """
+    Group messages of equal length into uint8 matrices.
+    Yields (indices, matrix) pairs, where indices are the positions of the matrix rows in messages.
+    Empty messages (blank lines of a text file) are skipped, as in the block readers of OdczytDanych.
+    """
+    groups = defaultdict(list)
+    for i, message in enumerate(messages):
+        if len(message) > 0:
+            groups[len(message)].append(i)
+    for length, indices in groups.items():
+        yield indices, np.array([messages[i] for i in indices], dtype=np.uint8).reshape(len(indices), length)
+
+# Read-only view of the corpus shared by the parent process, attached by init_worker
+_SHARED_DATASET = None
+_SHARED_MEMORY = None
+
+# BCH code (n, k, decoder) of the current run, set in workers by init_worker
+_RUN_CODE = (BCH_N, BCH_K, BCH_DECODER)
+
+def run_codec():
+    """Shared BCH codec of the current run (the config.py code unless init_worker set another)"""
+    return get_codec(*_RUN_CODE)
+
+@contextmanager
+def share_dataset(data):
+    """
+    Expose a dataset matrix to pool workers without a per-worker copy.
+    Memory-mapped files are shared by path; in-memory matrices are copied once into a
+    multiprocessing.shared_memory block, which is released when the context exits.
+    Yields a descriptor to pass to init_worker.
+    """
+    if isinstance(data, np.memmap):
+        yield ('memmap', data.filename, tuple(data.shape))
+        return
+    def copy_data(shared):
+        shared[...] = data
+
+    with _shared_matrix(data.shape, copy_data) as dataset:
+        yield dataset
+
+@contextmanager
+def share_input(input_file, message_length=None):
+    """
+    Load the corpus of input_file straight into shared memory for pool workers.
+    The blocks of OdczytDanych.czytaj_bloki are written one by one into a multiprocessing.shared_memory
+    block of the corpus shape, so peak memory is the unpacked corpus plus one block instead of
+    a full in-memory matrix and its shared copy; memory-mapped .u8 files are shared by path.
+    The shape is computed once and passed to the reader, so a text corpus is scanned twice
+    (shape, then read) rather than three times.
+    Yields (descriptor to pass to init_worker, number of messages).
+    """
+    reader = OdczytDanych(input_file, dlugosc_wiadomosci=message_length)
+    if reader.format == 'memmap':
+        with share_dataset(reader.odczytaj_macierz()) as dataset:
+            yield dataset, dataset[2][0]
+        return
+    shape = reader.ksztalt()
+    with _shared_matrix(shape, partial(reader.odczytaj_macierz, ksztalt=shape)) as dataset:
+        yield dataset, shape[0]
+
+@contextmanager
+def _shared_matrix(shape, fill):
+    # Shared uint8 matrix filled by fill(view); the view is dropped before the block is released
+    shm = shared_memory.SharedMemory(create=True, size=max(1, int(np.prod(shape))))
+    try:
+        fill(np.ndarray(shape, dtype=np.uint8, buffer=shm.buf))
+        yield ('shm', shm.name, tuple(shape))
+    finally:
+        shm.close()
+        shm.unlink()
+
+def attach_dataset(descriptor):
+    """Attach this process read-only to a dataset shared with share_dataset"""
+    global _SHARED_DATASET, _SHARED_MEMORY
+    kind, name, shape = descriptor
+    if kind == 'memmap':
+        _SHARED_DATASET = np.memmap(name, dtype=np.uint8, mode='r', shape=shape)
+    else:
+        _SHARED_MEMORY = shared_memory.SharedMemory(name=name)
+        _SHARED_DATASET = np.ndarray(shape, dtype=np.uint8, buffer=_SHARED_MEMORY.buf)
+        _SHARED_DATASET.flags.writeable = False
+
+def init_worker(dataset=None, code=None):
+    """
+    Select the run's BCH code (n, k, decoder), warm up its codec and attach the shared
+    dataset once per worker process. The codec tables come from the on-disk cache
+    filled by the parent, so workers do not rebuild them.
+    """
+    global _RUN_CODE
+    if code is not None:
+        _RUN_CODE = code
+    run_codec()
+    if dataset is not None:
+        attach_dataset(dataset)
+
+# Start method of worker pools: a fork server where the platform has one, otherwise spawn (e.g. on Windows)
+POOL_START_METHOD = "forkserver" if "forkserver" in mp.get_all_start_methods() else "spawn"
+
+@contextmanager
+def worker_pool(num_processes, dataset=None, code=None):
+    """
+    Process pool whose workers attach dataset and use the BCH code (n, k, decoder) (see init_worker).
+    Workers are started with POOL_START_METHOD instead of being forked from this process, because
+    forking after the parent has built a BCH codec can crash the workers; run_error_rate_analysis
+    builds the run's codec in the parent before every pool, so this applies to all modes.
+    The pool is closed and joined on a normal exit, so workers shut down cleanly.
+    """
+    pool = mp.get_context(POOL_START_METHOD).Pool(processes=num_processes, initializer=init_worker,
+                                                  initargs=(dataset, code))
+    try:
+        yield pool
+    except BaseException:
+        pool.terminate()
+        raise
+    else:
+        pool.close()
+    finally:
+        pool.join()
+
+@contextmanager
+def _pool_with_dataset(num_processes, data, code):
+    """worker_pool whose workers attach data shared with share_dataset"""
+    with share_dataset(data) as dataset, worker_pool(num_processes, dataset, code) as pool:
+        yield pool
+
+@contextmanager
+def _pool_with_input(num_processes, input_file, message_length, code):
+    """worker_pool whose workers attach the corpus of input_file loaded with share_input"""
+    with share_input(input_file, message_length) as (dataset, _), worker_pool(num_processes, dataset, code) as pool:
+        yield pool
+
+def pack_message_groups(messages):
+    """
+    Concatenate the equal-length groups of messages (see group_messages_by_length) into one flat
+    uint8 array, so a corpus of messages of different lengths can be shared with share_dataset.
+    Returns (array, groups), where groups lists (offset, number of messages, message length)
+    of every group in the array.
+    """
+    matrices = []
+    groups = []
+    offset = 0
+    for _, matrix in group_messages_by_length(messages):
+        matrices.append(matrix.ravel())
+        groups.append((offset, matrix.shape[0], matrix.shape[1]))
+        offset += matrix.size
+    return np.concatenate(matrices) if matrices else np.zeros(0, dtype=np.uint8), groups
+
+@dataclass(frozen=True)
+class SimulationConfig:
+    """
+    Settings shared by every task of a simulated sweep (see run_error_rate_analysis).
+    methods are (codec, channel, interleaved) tuples (see resolve_methods); is_error_prob is
+    only set in importance mode. shard_size is the number of messages per work unit, or per
+    batch in adaptive mode, the only mode using target_rel_width, min_error_events, max_bits
+    and confidence (see run_adaptive).
+    """
+    repetitions: int
+    seed: int
+    methods: tuple
+    ge_stream: bool = False
+    interleaver: tuple = None
+    common_noise: bool = False
+    is_error_prob: float = None
+    shard_size: int = 250
+    target_rel_width: float = 0.1
+    min_error_events: int = 100
+    max_bits: int = 10**8
+    confidence: float = 0.95
+
+@dataclass(frozen=True)
+class WorkUnit:
+    """One (error_prob, message shard) work unit: messages start..stop of the shared dataset"""
+    error_prob: float
+    shard_index: int
+    start: int
+    stop: int
+
+def run_simulation(error_prob, config, groups):
+    """
+    Run a single simulation of error_prob with the settings of config (a SimulationConfig).
+    groups describe the equal-length message groups of the corpus shared with this worker (see
+    pack_message_groups), and every group is simulated by simulate_shard with the channel
+    streams of channel_generators(config.seed, error_prob, 0).
+    """
+
     # Store error_prob as string with full precision
     error_prob_str = f"{error_prob:.6f}"
     error_prob = float(error_prob_str)  # Convert back to float to ensure exact precision
-    
-    # Make input_file path relative to this script's location
-    input_file = os.path.join(os.path.dirname(__file__), input_file)
-    
-    # Initialize counters and distributions
-    total_bits = 0
-    incorrect_bits_powielanie = 0
-    incorrect_bits_bch = 0
-    incorrect_bits_powielanie_ge = 0
-    incorrect_bits_bch_ge = 0
-    ilosc_danych = 0
-    
-    # Track error count distributions
-    error_dist_powielanie = defaultdict(int)
-    error_dist_bch = defaultdict(int)
-    error_dist_powielanie_ge = defaultdict(int)
-    error_dist_bch_ge = defaultdict(int)
-
-    # Create a single OdczytDanych instance
-    odczyt = OdczytDanych(input_file)
-    
-    # Read all messages from the file
-    dane_bin = odczyt.odczytaj_dane()  # Let it read all available messages
-    
-    for dane_wejsciowe in dane_bin:
-        ilosc_danych += 1
-        total_bits += len(dane_wejsciowe)
-        
-        # powielanie BSC
-        bledy_powielanie, dane_po_powielaniu, dane_po_bsc_powielanie, dane_zakodowane_powielanie = SymulacjaDlaPowielania.SymulujPowielanie(
-            dane_wejsciowe, 
-            error_prob=error_prob, 
-            repetitions=repetitions
-        )
-        errors = count_errors_in_sequence(dane_wejsciowe, dane_po_powielaniu)
-        error_dist_powielanie[errors] += 1
-        incorrect_bits_powielanie += errors
-
-        # BCH BSC - process data in 5-bit chunks
-        total_bch_errors = 0
-        decoded_bch_data = []
-        bch_chunks = prepare_data_for_bch(dane_wejsciowe)
-        
-        for chunk in bch_chunks:
-            bledy_BCH, dane_po_bch, dane_po_bsc_bch, dane_zakodowane_bch = SymulacjaDlaBCH.SymulujBCH(
-                chunk,
-                error_prob=error_prob
-            )
-            total_bch_errors += bledy_BCH
-            decoded_bch_data.extend(dane_po_bch[:len(chunk)])  # Only take the actual data length, not padding
-        
-        # Trim decoded data to original length
-        decoded_bch_data = decoded_bch_data[:len(dane_wejsciowe)]
-        errors = count_errors_in_sequence(dane_wejsciowe, decoded_bch_data)
-        error_dist_bch[errors] += 1
-        incorrect_bits_bch += errors
-
-        # powielanie Gilbert-Eliot
-        bledy_powielanie_ge, dane_po_powielaniu_ge, dane_po_ge_powielanie = SymulacjaDlaPowielaniaGEliot.SymulujPowielanieGEliot(
-            dane_wejsciowe,
-            error_prob=error_prob,
-            repetitions=repetitions
-        )
-        errors = count_errors_in_sequence(dane_wejsciowe, dane_po_powielaniu_ge)
-        error_dist_powielanie_ge[errors] += 1
-        incorrect_bits_powielanie_ge += errors
+    generators = channel_generators(config.seed, error_prob, 0)
 
-        # BCH Gilbert-Eliot - process data in 5-bit chunks
-        total_bch_ge_errors = 0
-        decoded_bch_ge_data = []
-        
-        for chunk in bch_chunks:
-            bledy_BCH_ge, dane_po_bch_ge, dane_po_ge_bch = SymulacjaBCHGEliot.SymulujBCHEliot(
-                chunk,
-                error_prob=error_prob
-            )
-            total_bch_ge_errors += bledy_BCH_ge
-            decoded_bch_ge_data.extend(dane_po_bch_ge[:len(chunk)])  # Only take the actual data length, not padding
-            
-        # Trim decoded data to original length
-        decoded_bch_ge_data = decoded_bch_ge_data[:len(dane_wejsciowe)]
-        errors = count_errors_in_sequence(dane_wejsciowe, decoded_bch_ge_data)
-        error_dist_bch_ge[errors] += 1
-        incorrect_bits_bch_ge += errors
+    merged = None
+    for offset, num_messages, length in groups:
+        messages = _SHARED_DATASET[offset:offset + num_messages * length].reshape(num_messages, length)
+        shard = simulate_shard(messages, error_prob, config.repetitions, generators,
+                               interleaver=config.interleaver, methods=config.methods)
+        merged = shard if merged is None else merge_partial_results(merged, shard)
+    return make_result(error_prob, config.repetitions, merged['total_bits'],
+                       merged['incorrect_bits'], merged['error_dists'])
 
-    return {
-        'error_prob': error_prob,
-        'repetitions': repetitions,
-        'total_bits': total_bits,
-        'incorrect_bits_powielanie': incorrect_bits_powielanie,
-        'incorrect_bits_bch': incorrect_bits_bch,
-        'incorrect_bits_powielanie_ge': incorrect_bits_powielanie_ge,
-        'incorrect_bits_bch_ge': incorrect_bits_bch_ge,
-        'duplicating_error_rate': incorrect_bits_powielanie/total_bits,
-        'bch_error_rate': incorrect_bits_bch/total_bits,
-        'duplicating_error_rate_geliot': incorrect_bits_powielanie_ge/total_bits,
-        'bch_error_rate_geliot': incorrect_bits_bch_ge/total_bits,
-        'error_dist_powielanie': dict(error_dist_powielanie),
-        'error_dist_bch': dict(error_dist_bch),
-        'error_dist_powielanie_ge': dict(error_dist_powielanie_ge),
-        'error_dist_bch_ge': dict(error_dist_bch_ge)
-    }
+def simulate_shard(data, error_prob, repetitions, generators=None, ge_stream=False, interleaver=None,
+                   common_noise=False, methods=None):
+    """
+    Run encode -> channel -> decode -> error count on a block of messages as batched array stages.
+    data is a uint8 matrix of shape (messages, bits); methods are the (codec, channel, interleaved)
+    tuples to simulate (see resolve_methods; by default the four methods of DOMYSLNE_METODY plus
+    BCH over G-E through the interleaver when one is given). Codecs and channels come from the
+    StartSymulacji.RejestrMetod registry; every codec encodes once for all of its channels, and
+    codes and channels that both support it (BCH over BSC) run on bit-packed uint64 words.
+    generators maps every method key to the random generator of its channel (see
+    channel_generators; fresh unseeded streams by default).
+    By default every G-E codeword (BCH) or message (repetition) starts a fresh channel; with
+    ge_stream the whole shard is sent as one continuous G-E stream, so bursts span codeword
+    boundaries. Interleaved methods send their codewords through the interleaver description
+    interleaver (see Kody.Przeplot.utworz_przeplot); they are only comparable with the plain
+    G-E methods with ge_stream, since fresh channels would restart per interleaved frame.
+    With common_noise every method draws its channel from one shared stream of uniforms
+    (common random numbers): each message gets a row of uniforms in transmission order, its
+    codewords take them from the start of the row, and a bit is in error when its uniform is
+    below the channel's error probability, so the BSC and good-state G-E channels flip the same
+    slots. Every method keeps its marginal error rate, and the differences between methods have
+    a smaller variance; the gain is modest (about 10-20% lower standard deviation at p=0.03),
+    because BCH and repetition codewords cover the shared uniforms differently and decode
+    different error patterns. Channels then always draw bit by bit.
+    Returns partial counters: {'total_bits', 'incorrect_bits', 'error_dists'}, keyed by method.
+    """
+    num_messages, message_length = data.shape
+    methods = [Metoda(*method) for method in resolve_methods(methods, interleaver)]
+    if generators is None:
+        generators = channel_generators(None, error_prob, 0)
+    params = {'repetitions': repetitions, 'bch': run_codec()}
+    codecs = {method.kodek: KODEKI[method.kodek](params) for method in methods}
+
+    # Common random numbers: plane 0 decides errors, plane 1 the G-E state transitions
+    noise = {}
+    if common_noise:
+        widths = {key: (codec.slowa_na_wiadomosc(message_length), codec.dlugosc_slowa(message_length))
+                  for key, codec in codecs.items()}
+        uniforms = generators['common'].random((2, num_messages, max(words * length for words, length in widths.values())))
+        noise = {key: uniforms[:, :, :words * length].reshape(2, -1, length) for key, (words, length) in widths.items()}
+
+    # Encode -> channel -> decode -> error count stages
+    encoded = {}
+    incorrect_bits = {}
+    error_dists = {}
+    for method in methods:
+        codec = codecs[method.kodek]
+        packed = codec.spakowane and KANALY[method.kanal].spakowane
+        if (method.kodek, packed) not in encoded:
+            encoded[(method.kodek, packed)] = codec.koduj(data, packed)
+        channel = KANALY[method.kanal](error_prob, generators[method.klucz])
+        word_length = codec.dlugosc_slowa(message_length)
+        interleaver_obj = utworz_przeplot(interleaver, word_length) if method.przeplot else None
+        received = channel.transmituj(encoded[(method.kodek, packed)], word_length, packed,
+                                      noise.get(method.kodek), ge_stream, interleaver_obj)
+        errors = codec.bledy(data, received, packed)
+        incorrect_bits[method.klucz] = int(errors.sum())
+        error_dists[method.klucz] = rozklad_bledow(errors)
+
+    return {'total_bits': int(data.size), 'incorrect_bits': incorrect_bits, 'error_dists': error_dists}
+
+def simulate_shard_importance(data, error_prob, repetitions, generators, is_error_prob, methods=None):
+    """
+    Importance-sampling counterpart of simulate_shard for very low error probabilities.
+    Channel errors are drawn with probability is_error_prob (and the bad-state probability of
+    parametry_ge(is_error_prob), capped at 0.5, in the bad G-E state) instead of error_prob, and every message is weighted by the
+    likelihood ratio of its channel realisation, so weighted error counts are unbiased
+    for the true channel. generators maps every method to its channel's generator (see
+    channel_generators); methods are (codec, channel) tuples as in simulate_shard, without interleaving.
+    Returns partial sums: weighted errors ('incorrect_bits'), their squares
+    ('incorrect_bits_sq'), weighted error distributions and the message count.
+    """
+    num_messages = len(data)
+    methods = [Metoda(*method) for method in resolve_methods(methods)]
+    params = {'repetitions': repetitions, 'bch': run_codec()}
+    codecs = {method.kodek: KODEKI[method.kodek](params) for method in methods}
+    encoded = {key: codec.koduj(data) for key, codec in codecs.items()}
+
+    partial = {'total_bits': int(data.size), 'num_messages': num_messages,
+               'incorrect_bits': {}, 'incorrect_bits_sq': {}, 'error_dists': {}}
+    for method in methods:
+        # Encode -> biased channel -> decode stages, keeping the log-weight of every message
+        channel = KANALY[method.kanal](error_prob, generators[method.klucz])
+        block, log_weights = channel.transmituj_istotnie(encoded[method.kodek], is_error_prob)
+        # Codewords of a message go through independent channels, so their weights multiply
+        weights = np.exp(log_weights.reshape(num_messages, -1).sum(axis=1))
+        errors = codecs[method.kodek].bledy(data, block)
+        weighted_errors = weights * errors
+        partial['incorrect_bits'][method.klucz] = float(weighted_errors.sum())
+        partial['incorrect_bits_sq'][method.klucz] = float((weighted_errors ** 2).sum())
+        weighted_dist = np.bincount(errors, weights=weights)
+        partial['error_dists'][method.klucz] = {count: float(weighted_dist[count])
+                                                for count in np.flatnonzero(weighted_dist).tolist()}
+    return partial
+
+def make_importance_result(error_prob, repetitions, partial):
+    """
+    Build the result dict of an importance-sampling run.
+    Error counts, rates and distributions are the unbiased weighted estimates, and
+    <rate>_variance holds the estimated variance of each rate estimate.
+    """
+    result = make_result(error_prob, repetitions, partial['total_bits'],
+                         partial['incorrect_bits'], partial['error_dists'])
+    num_messages = partial['num_messages']
+    for method_key, weighted_sum in partial['incorrect_bits'].items():
+        sample_variance = 0.0
+        if num_messages > 1:
+            sample_variance = max(0.0, (partial['incorrect_bits_sq'][method_key] - weighted_sum ** 2 / num_messages)
+                                  / (num_messages - 1))
+        result[f"{rate_key(method_key)}_variance"] = num_messages * sample_variance / partial['total_bits'] ** 2
+    return result
+
+def merge_partial_results(first, second):
+    """
+    Merge two partial results of simulate_shard by summing their counters and distributions.
+    Nested dicts are merged key by key, so any partial made of numbers and dicts of numbers
+    (e.g. the importance-sampling sums) can be merged the same way.
+    The merge is associative and commutative, so shards can be reduced in any order.
+    """
+    merged = dict(first)
+    for key, value in second.items():
+        if key not in merged:
+            merged[key] = value
+        elif isinstance(value, dict):
+            merged[key] = merge_partial_results(merged[key], value)
+        else:
+            merged[key] = merged[key] + value
+    return merged
+
+class ChannelStreams(dict):
+    """
+    Independent random generators of one (error_prob, shard) work unit, keyed by method
+    (plus 'common', the stream shared by all methods in common random numbers mode).
+    The generator of a key is created on first use from a child of the unit's
+    SeedSequence(seed, spawn_key=(error_prob, shard_index)), spawned under the CRC-32 of the key,
+    so every (error_prob, shard, channel) has its own stream that depends only on the seed, and
+    registering new methods never shifts the streams of existing ones.
+    With seed=None the streams are drawn from fresh entropy.
+    """
+    def __init__(self, seed, error_prob, shard_index):
+        super().__init__()
+        self.seed = seed
+        prob_key = int(round(error_prob * 1e6))  # error_prob is rounded to 6 decimal places
+        self.spawn_key = (prob_key, shard_index)
+
+    def __missing__(self, key):
+        child = np.random.SeedSequence(self.seed, spawn_key=self.spawn_key + (zlib.crc32(key.encode()),))
+        generator = self[key] = np.random.default_rng(child)
+        return generator
+
+def channel_generators(seed, error_prob, shard_index):
+    """Per-channel random generators of one (error_prob, shard) work unit (see ChannelStreams)"""
+    return ChannelStreams(seed, error_prob, shard_index)
+
+def run_work_unit(unit, config):
+    """
+    Simulate one WorkUnit on the dataset shared with this worker with the settings of config
+    (a SimulationConfig); with config.is_error_prob set the shard is simulated with importance sampling.
+    Returns (error_prob, shard_index, partial result).
+    """
+    data = _SHARED_DATASET[unit.start:unit.stop]
+    generators = channel_generators(config.seed, unit.error_prob, unit.shard_index)
+    if config.is_error_prob is not None:
+        partial_result = simulate_shard_importance(data, unit.error_prob, config.repetitions, generators,
+                                                   config.is_error_prob, config.methods)
+    else:
+        partial_result = simulate_shard(data, unit.error_prob, config.repetitions, generators, config.ge_stream,
+                                        config.interleaver, config.common_noise, config.methods)
+    return unit.error_prob, unit.shard_index, partial_result
+
+def run_adaptive(error_prob, config):
+    """
+    Simulate one error probability in batches until every method's error rate is resolved.
+    Batches of config.shard_size messages cycle over the shared dataset, each with its own random
+    streams. A method is resolved once the Wilson interval (at config.confidence) on its
+    post-decoding bit error rate is narrower than config.target_rel_width times the estimate, or
+    once it has seen config.min_error_events bit errors; simulation stops when all methods are
+    resolved or config.max_bits have been simulated.
+    Returns the result dict extended with stop_reason and <rate>_ci_low/<rate>_ci_high.
+    """
+    num_messages = len(_SHARED_DATASET)
+    batch_size = config.shard_size
+
+    merged = None
+    batch_index = 0
+    while True:
+        rows = (batch_index * batch_size + np.arange(batch_size)) % num_messages
+        generators = channel_generators(config.seed, error_prob, batch_index)
+        batch = simulate_shard(_SHARED_DATASET[rows], error_prob, config.repetitions, generators, config.ge_stream,
+                               config.interleaver, config.common_noise, config.methods)
+        merged = batch if merged is None else merge_partial_results(merged, batch)
+        batch_index += 1
+
+        total_bits = merged['total_bits']
+        intervals = {}
+        resolved_by_width = True
+        resolved = True
+        for method_key, errors in merged['incorrect_bits'].items():
+            low, high = wilson_interval(errors, total_bits, config.confidence)
+            intervals[method_key] = (low, high)
+            narrow = errors > 0 and (high - low) <= config.target_rel_width * errors / total_bits
+            resolved_by_width = resolved_by_width and narrow
+            resolved = resolved and (narrow or errors >= config.min_error_events)
+        if resolved:
+            stop_reason = 'ci_width' if resolved_by_width else 'error_events'
+            break
+        if total_bits >= config.max_bits:
+            stop_reason = 'max_bits'
+            break
+
+    result = make_result(error_prob, config.repetitions, merged['total_bits'],
+                         merged['incorrect_bits'], merged['error_dists'])
+    result['stop_reason'] = stop_reason
+    for method_key, (low, high) in intervals.items():
+        result[f"{rate_key(method_key)}_ci_low"] = low
+        result[f"{rate_key(method_key)}_ci_high"] = high
+    return result
+
+def run_analytic(error_prob, repetitions, data, n=BCH_N, k=BCH_K):
+    """
+    Compute the result of one error probability exactly instead of simulating it.
+    incorrect_bits and error distributions are expectations over the channel for the given
+    dataset (see StartSymulacji.ModelAnalityczny); the G-E columns use the forward recursion
+    with the same channel parameters and fresh-channel starts as the simulations.
+    """
+    incorrect_bits, error_dists = wynik_analityczny_bsc(data, error_prob, repetitions, n, k)
+    incorrect_bits_ge, error_dists_ge = wynik_analityczny_ge(data, error_prob, repetitions, n, k)
+    incorrect_bits.update(incorrect_bits_ge)
+    error_dists.update(error_dists_ge)
+    return make_result(error_prob, repetitions, int(data.size), incorrect_bits, error_dists)
+
+def compare_with_analytic(results, analytic_results, z_threshold=4.0):
+    """
+    Cross-check simulated results against analytic ones for the same error probabilities.
+    For every method the simulated error count is compared with the
+    expected one; the variance is taken from the analytic per-message error distribution.
+    Returns a list of (error_prob, method_key, simulated, expected, z) for every |z| above
+    z_threshold, so an empty list means the simulation agrees with the exact model.
+    """
+    analytic_by_prob = {result['error_prob']: result for result in analytic_results}
+    discrepancies = []
+    for result in results:
+        analytic = analytic_by_prob.get(result['error_prob'])
+        if analytic is None:
+            continue
+        method_keys = [key[len('incorrect_bits_'):] for key in analytic if key.startswith('incorrect_bits_')]
+        for method_key in method_keys:
+            if f'incorrect_bits_{method_key}' not in result:
+                continue
+            expected = analytic[f'incorrect_bits_{method_key}']
+            dist = analytic[f'error_dist_{method_key}']
+            num_messages = sum(dist.values())
+            mean = expected / num_messages
+            second_moment = sum(count * count * n for count, n in dist.items()) / num_messages
+            variance = num_messages * max(second_moment - mean * mean, 0.0)
+            # Scale the analytic dataset to the number of simulated bits (e.g. adaptive runs)
+            scale = result['total_bits'] / analytic['total_bits']
+            simulated = result[f'incorrect_bits_{method_key}']
+            deviation = simulated - expected * scale
+            z = deviation / math.sqrt(variance * scale) if variance > 0 else (0.0 if deviation == 0 else math.inf)
+            if abs(z) > z_threshold:
+                discrepancies.append((result['error_prob'], method_key, simulated, expected * scale, z))
+    return discrepancies
+
+def make_work_units(error_probs, num_messages, shard_size):
+    """Split every error probability into fixed-size message shards (a list of WorkUnit)"""
+    units = []
+    for error_prob in error_probs:
+        for shard_index, start in enumerate(range(0, num_messages, shard_size)):
+            units.append(WorkUnit(error_prob, shard_index, start, min(start + shard_size, num_messages)))
+    return units
+
+def input_fingerprint(input_file):
+    """Identify an input file by its absolute path, size and modification time"""
+    stat = os.stat(input_file)
+    return [os.path.abspath(input_file), stat.st_size, stat.st_mtime_ns]
+
+@contextmanager
+def open_store(store):
+    """Open the result store at path store (see ObslugaDanych.MagazynWynikow), or yield None without one"""
+    if store is None:
+        yield None
+        return
+    with MagazynWynikow(store) as results_store:
+        yield results_store
+
+def run_error_rate_analysis(min_error=0.01, max_error=0.3, step=0.01, repetitions=3, input_file="dane2.txt",
+                            mode="pipeline", shard_size=250, seed=None, message_length=None,
+                            target_rel_width=0.1, min_error_events=100, max_bits=10**8, confidence=0.95,
+                            is_error_prob=0.1, ge_stream=False, interleaver=None,
+                            bch_n=BCH_N, bch_k=BCH_K, bch_decoder=BCH_DECODER, store=None, run_id=None,
+                            result_cache=RESULT_CACHE_DIR, common_noise=False, methods=None):
+    """
+    Run analysis for different error rates with specified intervals using multiple processes.
+    mode selects the simulation engine: "pipeline" (batched array stages), "adaptive"
+    (batches until the confidence intervals are narrow enough, see run_adaptive),
+    "importance" (importance sampling from a channel biased to is_error_prob, see
+    simulate_shard_importance), "analytic" (exact values without simulation, see
+    run_analytic) or "per_message" (one task per error probability, run_simulation, which runs
+    simulate_shard on every equal-length message group of the corpus with a single random stream).
+    In pipeline mode every error probability is split into shards of shard_size messages,
+    the (error_prob, shard) work units are spread over the pool and their partial counters
+    are merged. Every (error_prob, shard, channel) has its own random stream spawned from seed
+    (see channel_generators), so results do not depend on the number of workers; with seed=None
+    a fresh seed is drawn. The seed of every simulated result is recorded in its seed column.
+    The input file is parsed once here and shared read-only with the workers
+    (message_length is only needed for memory-mapped .u8 input).
+    ge_stream switches the pipeline and adaptive modes to one continuous G-E stream per shard
+    or batch, and interleaver, e.g. ('blokowy', 8) or ('splotowy', 5, 2), adds an interleaved
+    BCH G-E method column (see simulate_shard). Interleaving requires ge_stream: without it every
+    transmitted frame starts a fresh channel in the good state, and an interleaved frame spans
+    several codewords, so the interleaved column would see longer channel memory than the plain
+    one and the two columns would not be comparable.
+    bch_n, bch_k and bch_decoder select the BCH code of the run; its tables are built once
+    into the on-disk cache and loaded by the workers. Every result records bch_n and bch_k.
+    With store, the path of an SQLite file, every finished work unit is committed to it under
+    run_id (by default a hash of the run configuration) as soon as it arrives: an (error_prob,
+    shard) unit in pipeline and importance modes, a whole error probability in adaptive and
+    per_message modes. Rerunning with the same configuration and run_id skips the stored units
+    and reuses the run's seed, so an interrupted run resumes where it stopped. Analytic mode
+    does not use the store.
+    result_cache is the directory of the content-addressed result cache (None disables it).
+    Every sweep point is stored under a hash of its full configuration (mode and its parameters,
+    code, repetitions, G-E parameters, error_prob, input corpus digest and seed) and returned
+    from the cache on later runs, so changing one point of a grid recomputes only that point.
+    Analytic points are always cached; simulated points only with an explicit seed.
+    common_noise makes all methods of a sweep point share one stream of uniforms (common random
+    numbers, see simulate_shard), which somewhat reduces the variance of differences between
+    methods such as the "Diff" columns of the summary; pipeline and adaptive modes only.
+    methods selects the (codec, channel, interleaved) combinations to simulate from the codecs and
+    channels of StartSymulacji.RejestrMetod, e.g. [('bch', 'bsc', False), ('bch', 'ge', True)]; only
+    those are encoded, transmitted and reported (see resolve_methods for the default). Analytic
+    mode always computes the four default methods.
+    """
+    if mode not in ('pipeline', 'adaptive', 'importance', 'analytic', 'per_message'):
+        raise ValueError(f"Unknown simulation mode '{mode}', "
+                         f"expected 'pipeline', 'adaptive', 'importance', 'analytic' or 'per_message'")
+    if ge_stream and mode not in ('pipeline', 'adaptive'):
+        raise ValueError(f"G-E stream mode is only supported in 'pipeline' and 'adaptive' modes, not '{mode}'")
+    if interleaver is not None and not ge_stream:
+        raise ValueError("Interleaving requires ge_stream=True, so the plain and interleaved G-E "
+                         "columns are sent through the same continuous channel")
+    if common_noise and (mode not in ('pipeline', 'adaptive') or ge_stream):
+        raise ValueError("Common random numbers are only supported in 'pipeline' and 'adaptive' modes "
+                         "without G-E stream mode")
+    if methods is not None and mode == 'analytic':
+        raise ValueError("Method selection is not supported in 'analytic' mode")
+    methods = resolve_methods(methods, interleaver) if mode != 'analytic' else None
 
-def run_error_rate_analysis(min_error=0.01, max_error=0.3, step=0.01, repetitions=3, input_file="dane2.txt"):
-    """Run analysis for different error rates with specified intervals using multiple processes"""
     # Use numpy to generate error probabilities to maintain precision
     error_probs = np.array([min_error + i * step for i in range(int((max_error - min_error) / step) + 1)])
     error_probs = np.round(error_probs, decimals=6)  # Round to 6 decimal places to avoid floating point issues
-    
-    # Prepare parameters for parallel processing
-    params = [(float(prob), repetitions, input_file) for prob in error_probs]
+    error_probs = [float(prob) for prob in error_probs]
     
     # Get the number of CPU cores (leave one core free for system)
     num_processes = max(1, mp.cpu_count() - 1)
     print(f"Running simulations using {num_processes} processes...")
-    
-    # Create a pool of processes
-    with mp.Pool(processes=num_processes) as pool:
-        # Run simulations in parallel with progress bar
-        results = list(tqdm(
-            pool.imap(run_simulation, params),
-            total=len(params),
-            desc="Simulating",
-            unit="error_prob"
-        ))
-    
+
+    code = (bch_n, bch_k, bch_decoder)
+    # Build or load the code tables once here, so the workers find them in the disk cache
+    get_codec(*code)
+
+    input_path = os.path.join(os.path.dirname(__file__), input_file)
+    # Everything that determines the results of a run; a stored run is resumed only if it matches
+    config = {'version': RESULT_FORMAT_VERSION, 'mode': mode, 'error_probs': error_probs, 'repetitions': repetitions,
+              'input': input_fingerprint(input_path), 'message_length': message_length,
+              'seed': seed if mode != 'analytic' else None,
+              'code': list(code), 'ge_stream': ge_stream, 'interleaver': interleaver, 'common_noise': common_noise,
+              'methods': methods}
+    if mode in ('pipeline', 'importance', 'adaptive'):
+        config['shard_size'] = shard_size
+    if mode == 'importance':
+        config['is_error_prob'] = is_error_prob
+    if mode == 'adaptive':
+        config.update(target_rel_width=target_rel_width, min_error_events=min_error_events,
+                      max_bits=max_bits, confidence=confidence)
+
+    # Only reproducible points are cached: analytic ones and simulations with an explicit seed
+    cache = None
+    if result_cache is not None and mode != 'analytic' and seed is None:
+        print("No seed given: the result cache is not used for this run")
+    if result_cache is not None and (mode == 'analytic' or seed is not None):
+        cache = PamiecWynikow(result_cache, RESULT_CACHE_MAX_BYTES, RESULT_CACHE_MAX_AGE_DAYS)
+        point_base = {key: value for key, value in config.items() if key not in ('error_probs', 'input')}
+        point_base['corpus'] = skrot_danych(input_path)
+
+    def point_config(error_prob):
+        # Full configuration of one sweep point, the address of its cached result
+        return dict(point_base, error_prob=error_prob, ge_params=list(parametry_ge(error_prob)))
+
+    cached = {}
+    if cache is not None:
+        for prob in error_probs:
+            result = cache.pobierz(point_config(prob))
+            if result is not None:
+                cached[prob] = result
+        if cached:
+            print(f"{len(cached)} of {len(error_probs)} sweep points loaded from the result cache")
+    todo_probs = [prob for prob in error_probs if prob not in cached]
+
+    if not todo_probs:
+        results = []
+    elif mode == 'analytic':
+        data = load_dataset_matrix(input_path, message_length)
+        results = [run_analytic(prob, repetitions, data, bch_n, bch_k) for prob in todo_probs]
+    else:
+        if seed is None:
+            seed = np.random.SeedSequence().entropy
+        sim_config = SimulationConfig(repetitions, seed, methods, ge_stream, interleaver, common_noise,
+                                      is_error_prob if mode == 'importance' else None, shard_size,
+                                      target_rel_width, min_error_events, max_bits, confidence)
+        with open_store(store) as results_store:
+            results = _simulate_points(results_store, run_id, config, sim_config, mode, todo_probs,
+                                       input_path, message_length, code, num_processes)
+
+    if cache is not None:
+        for result in results:
+            cache.zapisz(point_config(result['error_prob']), result)
     # Sort results by error probability to maintain order
-    results.sort(key=lambda x: x['error_prob'])
+    results = sorted(results + list(cached.values()), key=lambda x: x['error_prob'])
+    return tag_code(results, code)
+
+def _simulate_points(results_store, run_id, config, sim_config, mode, error_probs, input_path, message_length,
+                     code, num_processes):
+    """
+    Simulate error_probs in the given mode for run_error_rate_analysis with the settings of
+    sim_config (a SimulationConfig), resuming the run from results_store (None without a store).
+    Returns the result dicts in no particular order, each recording the run's seed.
+    """
+    completed = {}
+    if results_store is not None:
+        run_id, seed = results_store.rozpocznij_przebieg(config, run_id, sim_config.seed)
+        sim_config = replace(sim_config, seed=seed)
+        completed = results_store.zakonczone(run_id)
+        if completed:
+            print(f"Resuming run {run_id}: {len(completed)} work units already stored")
+
+    def record(error_prob, shard_index, result):
+        # Commit a finished work unit before anything else can go wrong
+        if results_store is not None:
+            results_store.zapisz(run_id, error_prob, shard_index, result)
+
+    if mode in ('per_message', 'adaptive'):
+        # One task per error probability
+        results = [completed[(prob, CALY_PUNKT)] for prob in error_probs if (prob, CALY_PUNKT) in completed]
+        todo = [prob for prob in error_probs if (prob, CALY_PUNKT) not in completed]
+        if mode == 'per_message':
+            # The corpus is parsed once here and shared with the workers
+            data, groups = pack_message_groups(OdczytDanych(input_path).odczytaj_dane())
+            task = partial(run_simulation, config=sim_config, groups=groups)
+            pool_context = _pool_with_dataset(num_processes, data, code)
+        else:
+            # Each error probability streams its own batches
+            task = partial(run_adaptive, config=sim_config)
+            pool_context = _pool_with_input(num_processes, input_path, message_length, code)
+        with pool_context as pool:
+            # Run simulations in parallel with progress bar
+            for result in tqdm(
+                pool.imap_unordered(task, todo),
+                total=len(todo),
+                desc="Simulating",
+                unit="error_prob"
+            ):
+                record(result['error_prob'], CALY_PUNKT, result)
+                results.append(result)
+        return tag_seed(results, sim_config.seed)
+
+    # Reduce partial results per error probability as work units finish
+    partials = {}
+    def add_partial(error_prob, shard):
+        partials[error_prob] = merge_partial_results(partials[error_prob], shard) if error_prob in partials else shard
+    # Only the requested points: the others of a stored run may have come from the result cache
+    for (error_prob, _), shard in completed.items():
+        if error_prob in error_probs:
+            add_partial(error_prob, shard)
+    with share_input(input_path, message_length) as (dataset, num_messages), \
+            worker_pool(num_processes, dataset, code) as pool:
+        units = [unit for unit in make_work_units(error_probs, num_messages, sim_config.shard_size)
+                 if (unit.error_prob, unit.shard_index) not in completed]
+        for error_prob, shard_index, shard in tqdm(
+            pool.imap_unordered(partial(run_work_unit, config=sim_config), units),
+            total=len(units),
+            desc="Simulating",
+            unit="shard"
+        ):
+            record(error_prob, shard_index, shard)
+            add_partial(error_prob, shard)
+
+    if mode == 'importance':
+        return tag_seed([make_importance_result(error_prob, sim_config.repetitions, partials[error_prob])
+                         for error_prob in partials], sim_config.seed)
+    return tag_seed([make_result(error_prob, sim_config.repetitions, partials[error_prob]['total_bits'],
+                                 partials[error_prob]['incorrect_bits'], partials[error_prob]['error_dists'])
+                     for error_prob in partials], sim_config.seed)
+
+def tag_code(results, code):
+    """Record the BCH code parameters of a run in every result dict (bch_n and bch_k columns)"""
+    for result in results:
+        result['bch_n'], result['bch_k'] = code[0], code[1]
+    return results
+
+def tag_seed(results, seed):
+    """Record the seed a run's random streams were spawned from in every result dict (seed column)"""
+    for result in results:
+        result['seed'] = seed
+    return results
+
+def run_code_sweep(codes, **kwargs):
+    """
+    Run run_error_rate_analysis once per BCH code and concatenate the results.
+    codes is a list of (n, k) pairs, e.g. [(15, 5), (15, 7), (31, 16), (63, 36)];
+    other keyword arguments are passed to every run.
+    """
+    results = []
+    for n, k in codes:
+        results.extend(run_error_rate_analysis(bch_n=n, bch_k=k, **kwargs))
     return results
 
+def save_results(results, csv_filename):
+    """
+    Save the main results (without error distributions) to a CSV file.
+    Keys beyond RESULT_FIELDNAMES, such as adaptive-mode CI bounds, become extra columns.
+    """
+    fieldnames = list(RESULT_FIELDNAMES)
+    for result in results:
+        for key in result:
+            if key not in fieldnames and not key.startswith('error_dist_'):
+                fieldnames.append(key)
+
+    with open(csv_filename, 'w', newline='') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+
+        writer.writeheader()
+        for result in results:
+            # Create a copy without the distribution data
+            result_copy = {k: v for k, v in result.items() if not k.startswith('error_dist_')}
+            # Format error_prob with full precision
+            result_copy['error_prob'] = f"{result['error_prob']:.6f}"
+            writer.writerow(result_copy)
+
 def save_error_distributions(results, results_dir, timestamp):
-    """Save error count distributions to separate CSV files"""
-    methods = [
-        ('powielanie', 'Duplicating BSC'),
-        ('bch', 'BCH BSC'),
-        ('powielanie_ge', 'Duplicating G-E'),
-        ('bch_ge', 'BCH G-E')
-    ]
+    """
+    Save error count distributions to separate CSV files, one per method present in every result
+    (labels come from the StartSymulacji.RejestrMetod registry).
+    """
+    methods = []
+    for key in (results[0] if results else {}):
+        if key.startswith('error_dist_'):
+            method_key = key[len('error_dist_'):]
+            methods.append((method_key, znajdz_metode(method_key).etykieta))
     
     for method_key, method_name in methods:
+        if not all(f'error_dist_{method_key}' in result for result in results):
+            continue
         dist_filename = os.path.join(results_dir, f"error_distribution_{method_key}_{timestamp}.csv")
         
         # Get all possible error counts across all error probabilities
@@ -206,64 +873,74 @@ def save_error_distributions(results, results_dir, timestamp):
         print(f"Error distribution for {method_name} saved to {dist_filename}")
 
 if __name__ == "__main__":
+    # Create timestamp for unique filename
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+
+    # Get the workspace root directory (one level up from this script)
+    workspace_root = os.path.dirname(os.path.dirname(__file__))
+    results_dir = os.path.join(workspace_root, 'results')
+
+    # Finished work units are committed to this store as they arrive; passing the run name
+    # of an interrupted run as the first argument resumes it instead of starting over
+    store = os.path.join(results_dir, 'simulation_store.sqlite')
+    run_name = sys.argv[1] if len(sys.argv) > 1 else timestamp
+    # A fixed seed makes the sweeps reproducible, so unchanged points come from the result cache;
+    # the second argument overrides SIMULATION_SEED from config.py
+    seed = int(sys.argv[2]) if len(sys.argv) > 2 else SIMULATION_SEED
     try:
         # Install tqdm if not already installed
         import importlib
         if importlib.util.find_spec("tqdm") is None:
             import subprocess
             subprocess.check_call(["pip", "install", "tqdm"])
-            
-        # Create timestamp for unique filename
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        
-        # Get the workspace root directory (one level up from this script)
-        workspace_root = os.path.dirname(os.path.dirname(__file__))
         
         # Create results directory in workspace root
-        results_dir = os.path.join(workspace_root, 'results')
         os.makedirs(results_dir, exist_ok=True)
         
         print(f"Results will be saved to: {results_dir}")
+        print(f"Run name: {run_name}, seed: {seed}")
         
         # Run simulation with very low error rate first
         very_low_error_results = run_error_rate_analysis(
             min_error=0.000001,  # 10^-6
             max_error=0.000001,
             step=0.000001,
-            repetitions=3
+            repetitions=3,
+            seed=seed,
+            store=store,
+            run_id=f"{run_name}/very_low"
         )
         
-        # Run regular simulation
+        # Run regular simulation; common_noise=True would narrow the Diff columns of the summary
+        # only slightly (see simulate_shard), so the methods keep independent streams
         regular_results = run_error_rate_analysis(
             min_error=0.005,    # 0.5%
             max_error=0.05,     # 5%
             step=0.005,         # 0.5% intervals
-            repetitions=3
+            repetitions=3,
+            seed=seed,
+            store=store,
+            run_id=f"{run_name}/regular"
         )
         
         # Combine results
         results = very_low_error_results + regular_results
+
+        # Cross-check the simulated BSC results against the exact model
+        analytic_results = run_error_rate_analysis(
+            min_error=0.005,
+            max_error=0.05,
+            step=0.005,
+            repetitions=3,
+            mode="analytic"
+        )
+        for error_prob, method_key, simulated, expected, z in compare_with_analytic(regular_results, analytic_results):
+            print(f"Warning: {method_key} at error_prob={error_prob:.6f} simulated {simulated} errors, "
+                  f"expected {expected:.1f} (z={z:.1f})")
         
         # Save main results to CSV
         csv_filename = os.path.join(results_dir, f"simulation_results_{timestamp}.csv")
-        with open(csv_filename, 'w', newline='') as csvfile:
-            fieldnames = ['error_prob', 'repetitions', 'total_bits',
-                         'incorrect_bits_powielanie', 'incorrect_bits_bch',
-                         'incorrect_bits_powielanie_ge', 'incorrect_bits_bch_ge',
-                         'duplicating_error_rate', 'bch_error_rate',
-                         'duplicating_error_rate_geliot', 'bch_error_rate_geliot']
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            
-            writer.writeheader()
-            for result in results:
-                # Format error_prob with full precision
-                result_copy = result.copy()
-                result_copy['error_prob'] = f"{result['error_prob']:.6f}"
-                # Create a copy without the distribution data
-                result_copy = {k: v for k, v in result_copy.items() if k not in 
-                             ['error_dist_powielanie', 'error_dist_bch', 
-                              'error_dist_powielanie_ge', 'error_dist_bch_ge']}
-                writer.writerow(result_copy)
+        save_results(results, csv_filename)
         
         print(f"\nMain results have been saved to {csv_filename}")
         
@@ -291,7 +968,8 @@ if __name__ == "__main__":
                       f"{result['bch_error_rate_geliot']:^7.4f} | "
                       f"{ge_diff:^8.4f}")
     except KeyboardInterrupt:
-        print("\nSimulation interrupted by user. Partial results may have been saved.")
+        print(f"\nSimulation interrupted by user. Finished work units are stored in {store}; "
+              f"run `python Start.py {' '.join([run_name] + sys.argv[2:3])}` to resume.")
     except Exception as e:
         print(f"\nAn error occurred: {str(e)}")
         raise
@@ -0,0 +1,175 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+import numpy as np
+import Start
+from ObslugaDanych.MagazynWynikow import MagazynWynikow
+from StartSymulacji.RejestrMetod import DOMYSLNE_METODY
+from Start import (group_messages_by_length, merge_partial_results, rate_key, resolve_methods, run_adaptive,
+                   run_error_rate_analysis, wilson_interval, SimulationConfig, simulate_shard, channel_generators,
+                   make_result, run_analytic, compare_with_analytic)
+
+class TestStart(unittest.TestCase):
+    def setUp(self):
+        self.katalog = tempfile.TemporaryDirectory()
+        self.addCleanup(self.katalog.cleanup)
+
+    def zapisz_tekst(self, linie):
+        sciezka = os.path.join(self.katalog.name, 'dane.txt')
+        with open(sciezka, 'w') as plik:
+            plik.write('\n'.join(linie) + '\n')
+        return sciezka
+
+    def test_group_skips_empty_messages(self):
+        """Test that empty messages are left out of the length groups."""
+        grupy = list(group_messages_by_length([[0, 1], [], [1, 1], [1, 0, 1]]))
+        self.assertEqual([(indeksy, macierz.shape) for indeksy, macierz in grupy], [([0, 2], (2, 2)), ([3], (1, 3))])
+
+    def test_per_message_with_blank_line(self):
+        """Test that a blank line in a text corpus does not break the per-message mode."""
+        sciezka = self.zapisz_tekst(['0110101', '', '1100110'])
+        wyniki = run_error_rate_analysis(min_error=0.01, max_error=0.01, step=0.01, input_file=sciezka,
+                                         mode='per_message', seed=1, result_cache=None)
+        self.assertEqual(wyniki[0]['total_bits'], 14)
+        self.assertEqual(sum(wyniki[0]['error_dist_bch'].values()), 2)
+
+    def test_result_cache(self):
+        """Test that a seeded sweep point is reused from the result cache and recomputed when a parameter changes."""
+        sciezka = self.zapisz_tekst(['0110101', '1100110'])
+        pamiec = os.path.join(self.katalog.name, 'pamiec')
+        parametry = dict(min_error=0.05, max_error=0.05, step=0.01, input_file=sciezka, mode='per_message',
+                         seed=1, result_cache=pamiec)
+        wyniki = run_error_rate_analysis(**parametry)
+        self.assertEqual(len(os.listdir(pamiec)), 1)
+        self.assertEqual(run_error_rate_analysis(**parametry), wyniki)
+        self.assertEqual(len(os.listdir(pamiec)), 1)
+        run_error_rate_analysis(**dict(parametry, repetitions=5))
+        self.assertEqual(len(os.listdir(pamiec)), 2)
+
+    def test_cached_points_of_stored_run(self):
+        """Test that a resumed stored run does not count its points again when they come from the result cache."""
+        sciezka = self.zapisz_tekst(['0110101', '1100110', '1010101', '0001110'])
+        pamiec = os.path.join(self.katalog.name, 'pamiec')
+        parametry = dict(min_error=0.05, max_error=0.1, step=0.05, input_file=sciezka, seed=1,
+                         store=os.path.join(self.katalog.name, 'magazyn.sqlite'), run_id='przebieg',
+                         result_cache=pamiec)
+        wyniki = run_error_rate_analysis(**parametry)
+        # Usunięcie jednego punktu z pamięci, jak przy wygaszaniu najdawniej używanych plików
+        os.remove(os.path.join(pamiec, sorted(os.listdir(pamiec))[0]))
+        ponownie = run_error_rate_analysis(**parametry)
+        self.assertEqual([wynik['error_prob'] for wynik in ponownie], [0.05, 0.1])
+        self.assertEqual(ponownie, wyniki)
+
+    def test_merge_stored_partials(self):
+        """Test that partial results read back from the store merge like the ones that were stored."""
+        czesciowe = [{'total_bits': 70, 'incorrect_bits': {'bch': i, 'bch_ge': 2 * i},
+                      'error_dists': {'bch': {0: 10 - i, 1: i}, 'bch_ge': {0: 10 - i, 2: i}}} for i in range(1, 4)]
+        with MagazynWynikow(os.path.join(self.katalog.name, 'magazyn.sqlite')) as magazyn:
+            id_przebiegu, _ = magazyn.rozpocznij_przebieg({'mode': 'pipeline'})
+            for fragment, czesciowy in enumerate(czesciowe):
+                magazyn.zapisz(id_przebiegu, 0.01, fragment, czesciowy)
+            zapisane = magazyn.zakonczone(id_przebiegu)
+        scalone = czesciowe[0]
+        for czesciowy in czesciowe[1:]:
+            scalone = merge_partial_results(scalone, czesciowy)
+        z_magazynu = zapisane[(0.01, 0)]
+        for fragment in (1, 2):
+            z_magazynu = merge_partial_results(z_magazynu, zapisane[(0.01, fragment)])
+        self.assertEqual(z_magazynu, scalone)
+        self.assertEqual(scalone['error_dists']['bch_ge'], {0: 24, 2: 6})
+
+    def test_resume_interrupted_run(self):
+        """Test that a run missing some stored shards resumes to the results of an uninterrupted run."""
+        sciezka = self.zapisz_tekst(['0110101', '1100110', '1010101', '0001110'] * 3)
+        magazyn = os.path.join(self.katalog.name, 'magazyn.sqlite')
+        parametry = dict(min_error=0.05, max_error=0.1, step=0.05, input_file=sciezka, shard_size=4,
+                         store=magazyn, run_id='przebieg', result_cache=None)
+        wyniki = run_error_rate_analysis(**parametry)
+        # Przerwanie po pierwszym fragmencie każdego punktu: pozostałe trzeba policzyć ponownie
+        polaczenie = sqlite3.connect(magazyn)
+        with polaczenie:
+            polaczenie.execute("DELETE FROM jednostki WHERE fragment > 0")
+        polaczenie.close()
+        self.assertEqual(run_error_rate_analysis(**parametry), wyniki)
+        with self.assertRaises(ValueError):
+            run_error_rate_analysis(**dict(parametry, repetitions=5))
+
+    def test_importance_sampling_matches_analytic(self):
+        """Test that importance sampling at a very low error probability agrees with the exact model."""
+        wiersze = np.random.default_rng(0).integers(0, 2, (2000, 20))
+        sciezka = self.zapisz_tekst([''.join(map(str, wiersz)) for wiersz in wiersze])
+        parametry = dict(min_error=1e-4, max_error=1e-4, step=1e-4, input_file=sciezka, result_cache=None)
+        istotne, = run_error_rate_analysis(mode='importance', seed=3, shard_size=500, is_error_prob=0.03,
+                                           **parametry)
+        dokladne, = run_error_rate_analysis(mode='analytic', **parametry)
+        metody = [klucz[len('incorrect_bits_'):] for klucz in dokladne if klucz.startswith('incorrect_bits_')]
+        self.assertEqual(len(metody), 4)
+        for metoda in metody:
+            odchylenie = np.sqrt(istotne[f'{rate_key(metoda)}_variance']) * istotne['total_bits']
+            self.assertGreater(odchylenie, 0, metoda)
+            roznica = istotne[f'incorrect_bits_{metoda}'] - dokladne[f'incorrect_bits_{metoda}']
+            self.assertLess(abs(roznica), 4 * odchylenie, metoda)
+
+    def test_wilson_interval(self):
+        """Test the Wilson score interval against known values."""
+        np.testing.assert_allclose(wilson_interval(5, 10), (0.236593, 0.763407), atol=1e-6)
+        # Zero błędów: dolna granica 0, górna z^2 / (n + z^2)
+        z2 = 1.959964 ** 2
+        np.testing.assert_allclose(wilson_interval(0, 10), (0.0, z2 / (10 + z2)), atol=1e-6)
+        np.testing.assert_allclose(wilson_interval(10, 10), (10 / (10 + z2), 1.0), atol=1e-6)
+        np.testing.assert_allclose(wilson_interval(1, 100, confidence=0.99), (0.001175, 0.079801), atol=1e-5)
+        self.assertEqual(wilson_interval(0, 0), (0.0, 1.0))
+
+    def adaptacyjny(self, error_prob, **ustawienia):
+        """Runs run_adaptive in this process on a small shared dataset."""
+        self.addCleanup(setattr, Start, '_SHARED_DATASET', Start._SHARED_DATASET)
+        Start._SHARED_DATASET = np.random.default_rng(0).integers(0, 2, (200, 20), dtype=np.uint8)
+        return run_adaptive(error_prob, SimulationConfig(3, 1, resolve_methods(), shard_size=100, **ustawienia))
+
+    def assert_przedzialy(self, wynik):
+        for klucz in (metoda.klucz_stopy for metoda in DOMYSLNE_METODY):
+            self.assertLessEqual(wynik[f'{klucz}_ci_low'], wynik[klucz])
+            self.assertLessEqual(wynik[klucz], wynik[f'{klucz}_ci_high'])
+
+    def test_adaptive_stops_at_max_bits(self):
+        """Test that a point with too rare errors stops at max_bits."""
+        wynik = self.adaptacyjny(1e-4, target_rel_width=0.01, min_error_events=10**6, max_bits=10000)
+        self.assertEqual(wynik['stop_reason'], 'max_bits')
+        # Partie po 100 wiadomości po 20 bitów: zatrzymanie po pierwszej partii, która osiąga max_bits
+        self.assertEqual(wynik['total_bits'], 10000)
+        self.assert_przedzialy(wynik)
+
+    def test_adaptive_stops_at_error_events(self):
+        """Test that a point stops once every method has seen min_error_events errors."""
+        wynik = self.adaptacyjny(0.2, target_rel_width=1e-6, min_error_events=50, max_bits=10**7)
+        self.assertEqual(wynik['stop_reason'], 'error_events')
+        self.assertTrue(all(wynik[klucz] >= 50 for klucz in wynik if klucz.startswith('incorrect_bits_')))
+        self.assertLess(wynik['total_bits'], 10**7)
+        self.assert_przedzialy(wynik)
+
+    def test_adaptive_stops_at_precision_target(self):
+        """Test that a point stops once every interval is narrower than the precision target."""
+        wynik = self.adaptacyjny(0.2, target_rel_width=0.5, min_error_events=10**6, max_bits=10**7)
+        self.assertEqual(wynik['stop_reason'], 'ci_width')
+        self.assert_przedzialy(wynik)
+        for klucz in (metoda.klucz_stopy for metoda in DOMYSLNE_METODY):
+            self.assertLessEqual(wynik[f'{klucz}_ci_high'] - wynik[f'{klucz}_ci_low'], 0.5 * wynik[klucz])
+
+    def test_common_noise_keeps_marginals(self):
+        """Test that with common random numbers every method still matches its exact error distribution."""
+        dane = np.random.default_rng(2).integers(0, 2, (3000, 20), dtype=np.uint8)
+        for p in (0.03, 0.1):
+            czesciowy = simulate_shard(dane, p, 3, channel_generators(11, p, 0), common_noise=True)
+            wynik = make_result(p, 3, czesciowy['total_bits'], czesciowy['incorrect_bits'], czesciowy['error_dists'])
+            rozbieznosci = compare_with_analytic([wynik], [run_analytic(p, 3, dane)], z_threshold=0.0)
+            self.assertEqual(len(rozbieznosci), 4)
+            self.assertTrue(all(abs(z) < 4 for *_, z in rozbieznosci), rozbieznosci)
+
+    def test_interleaver_requires_stream(self):
+        """Test that interleaving without the continuous G-E channel is rejected."""
+        with self.assertRaises(ValueError):
+            run_error_rate_analysis(interleaver=('blokowy', 8), result_cache=None)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,24 +1,31 @@
-from Kody.BCH import BCH
+from Kody.BCH import get_codec
 from ObslugaDanych.LiczenieBledow import zlicz_bledy_bch
 from Przesyl.GEliot import KanalGilbertaElliotta
+from StartSymulacji.ModelAnalityczny import parametry_ge
 
 
-def SymulujBCHEliot(dane_wejsciowe, error_prob=0.1):
+def SymulujBCHEliot(dane_wejsciowe, error_prob=0.1, bch=None, kanal_ge=None):
     """
     Symulacja kodowania i dekodowania danych za pomocą BCH oraz transmisji przez kanał Gilberta-Elliotta.
     :param dane_wejsciowe: Oryginalne dane wejściowe (ciąg zer i jedynek)
     :param error_prob: Podstawowe prawdopodobieństwo błędu (dla stanu dobrego)
+    :param bch: Gotowy koder BCH do ponownego użycia (domyślnie wspólny koder z get_codec)
+    :param kanal_ge: Kanał do ponownego użycia, którego stan przechodzi między wywołaniami
+                     (domyślnie nowy kanał w stanie dobrym)
     :return: Liczba błędów w danych odebranych
     """
     # Inicjalizacja klasy BCH i kanału Gilberta-Elliotta
-    bch = BCH()
-    # Używamy error_prob jako niskiego prawdopodobieństwa błędu, a 3x większe jako wysokie
-    kanal_ge = KanalGilbertaElliotta(
-        niskie_prawd_bledu=error_prob,
-        wysokie_prawd_bledu=min(3 * error_prob, 1.0),
-        przejscie_dobry_na_zly=0.05,
-        przejscie_zly_na_dobry=0.1
-    )
+    if bch is None:
+        bch = get_codec()
+    # Parametry kanału jak we wszystkich symulacjach (zob. parametry_ge)
+    if kanal_ge is None:
+        niskie, wysokie, dobry_na_zly, zly_na_dobry = parametry_ge(error_prob)
+        kanal_ge = KanalGilbertaElliotta(
+            niskie_prawd_bledu=niskie,
+            wysokie_prawd_bledu=wysokie,
+            przejscie_dobry_na_zly=dobry_na_zly,
+            przejscie_zly_na_dobry=zly_na_dobry
+        )
 
     # Kodowanie danych
     zakodowane = bch.koduj(dane_wejsciowe)
@@ -31,4 +38,4 @@ def SymulujBCHEliot(dane_wejsciowe, error_prob=0.1):
 
     # Obliczenie liczby błędów
     bledy = zlicz_bledy_bch(dane_wejsciowe, odkodowane_dane)
-    return bledy, odkodowane_dane, dane_po_kanale
\ No newline at end of file
+    return bledy, odkodowane_dane, dane_po_kanale
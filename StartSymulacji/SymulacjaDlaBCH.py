@@ -1,17 +1,19 @@
-from Kody.BCH import BCH
+from Kody.BCH import get_codec
 from ObslugaDanych.LiczenieBledow import zlicz_bledy_bch
 from Przesyl.BSC import KanalBSC
 
 
-def SymulujBCH(dane_wejsciowe, error_prob=0.1):
+def SymulujBCH(dane_wejsciowe, error_prob=0.1, bch=None):
     """
     Symulacja kodowania i dekodowania danych za pomocą BCH oraz transmisji przez BSC.
     :param dane_wejsciowe: Oryginalne dane wejściowe (ciąg zer i jedynek)
     :param error_prob: Prawdopodobieństwo błędu w kanale BSC
+    :param bch: Gotowy koder BCH do ponownego użycia (domyślnie wspólny koder z get_codec)
     :return: Liczba błędów w danych odebranych
     """
     # Inicjalizacja klasy BCH i kanału BSC
-    bch = BCH()
+    if bch is None:
+        bch = get_codec()
     kanal_bsc = KanalBSC(prawd_bledu=error_prob)
 
     # Kodowanie danych
@@ -25,4 +27,4 @@ def SymulujBCH(dane_wejsciowe, error_prob=0.1):
 
     # Obliczenie liczby błędów
     bledy = zlicz_bledy_bch(dane_wejsciowe, odkodowane_dane)
-    return bledy, odkodowane_dane, dane_po_kanale, zakodowane
\ No newline at end of file
+    return bledy, odkodowane_dane, dane_po_kanale, zakodowane
@@ -1,24 +1,29 @@
 from Kody.PowielanieBitow import PowielanieBitow
 from ObslugaDanych.LiczenieBledow import zlicz_bledyPowielanie
 from Przesyl.GEliot import KanalGilbertaElliotta
+from StartSymulacji.ModelAnalityczny import parametry_ge
 
 
-def SymulujPowielanieGEliot(dane_wejsciowe, error_prob=0.1, repetitions=3):
+def SymulujPowielanieGEliot(dane_wejsciowe, error_prob=0.1, repetitions=3, kanal_ge=None):
     """
     Symulacja kodowania i dekodowania danych za pomocą powielania oraz transmisji przez kanał Gilberta-Elliotta.
     :param dane_wejsciowe: Oryginalne dane wejściowe (ciąg zer i jedynek)
     :param error_prob: Podstawowe prawdopodobieństwo błędu (dla stanu dobrego)
     :param repetitions: Liczba powtórzeń każdego bitu
+    :param kanal_ge: Kanał do ponownego użycia, którego stan przechodzi między wywołaniami
+                     (domyślnie nowy kanał w stanie dobrym)
     :return: Liczba błędów w danych odebranych
     """
     powielanie = PowielanieBitow(liczba_powtorzen=repetitions)
-    # Używamy error_prob jako niskiego prawdopodobieństwa błędu, a 3x większe jako wysokie
-    kanal_ge = KanalGilbertaElliotta(
-        niskie_prawd_bledu=error_prob,
-        wysokie_prawd_bledu=min(3 * error_prob, 1.0),
-        przejscie_dobry_na_zly=0.05,
-        przejscie_zly_na_dobry=0.1
-    )
+    # Parametry kanału jak we wszystkich symulacjach (zob. parametry_ge)
+    if kanal_ge is None:
+        niskie, wysokie, dobry_na_zly, zly_na_dobry = parametry_ge(error_prob)
+        kanal_ge = KanalGilbertaElliotta(
+            niskie_prawd_bledu=niskie,
+            wysokie_prawd_bledu=wysokie,
+            przejscie_dobry_na_zly=dobry_na_zly,
+            przejscie_zly_na_dobry=zly_na_dobry
+        )
 
     # Kodowanie danych
     zakodowane = powielanie.koduj(dane_wejsciowe)
@@ -31,4 +36,4 @@ def SymulujPowielanieGEliot(dane_wejsciowe, error_prob=0.1, repetitions=3):
 
     # Obliczenie liczby błędów
     bledy = zlicz_bledyPowielanie(dane_wejsciowe, odkodowane_dane)
-    return bledy, odkodowane_dane, dane_po_kanale
\ No newline at end of file
+    return bledy, odkodowane_dane, dane_po_kanale
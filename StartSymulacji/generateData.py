@@ -1,21 +1,23 @@
-import random
+import numpy as np
 import os
 
-def generate_binary_data(rows, filename="dane2.txt"):
+def generate_binary_data(rows, filename="dane2.txt", seed=None):
     """
-    Generate a specified number of rows with 8-bit binary strings and save to a file.
+    Generate a specified number of rows with 5-bit binary strings and save to a file.
 
     :param rows: Number of rows to generate.
     :param filename: Name of the file to save the data.
+    :param seed: Seed of the NumPy random generator (None draws a fresh one), so a corpus can be regenerated exactly.
     :return: None
     """
     # Ensure the file is created in the StartSymulacji directory
     file_path = os.path.join(os.path.dirname(__file__), filename)
+    generator = np.random.default_rng(seed)
     
     with open(file_path, "w") as file:
-        for _ in range(rows):
-            # Generate 8-bit binary string
-            binary_string = ''.join(random.choice('01') for _ in range(5))
+        for bits in generator.integers(0, 2, (rows, 5)):
+            # Generate 5-bit binary string
+            binary_string = ''.join(map(str, bits))
             file.write(binary_string + "\n")
 
 if __name__ == "__main__":
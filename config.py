@@ -1,16 +1,36 @@
+import os
+
 # Global BCH parameters
 BCH_N = 15  # Codeword length
 BCH_K = 5  # Message length
+BCH_DECODER = "galois"  # Decoding engine: "galois" (Berlekamp-Massey) or "lut" (syndrome table)
+# Directory of precomputed BCH tables (generator matrices, syndrome tables); None disables the disk cache
+BCH_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".bch_cache")
+# Directory of cached simulation results, one file per sweep point; None disables the result cache
+RESULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".result_cache")
+RESULT_CACHE_MAX_BYTES = 256 * 1024 * 1024  # Least recently used results are evicted above this size
+RESULT_CACHE_MAX_AGE_DAYS = 30  # Results unused for longer than this are evicted
+# Seed of the sweeps run by StartSymulacji/Start.py; None draws a fresh seed every run, which disables the result cache
+SIMULATION_SEED = 20240611
 
 # Function to validate BCH parameters
-def validate_bch_params():
+def validate_bch_params(n=BCH_N, k=BCH_K):
     """
     Validate that the BCH parameters are valid.
+    Defaults to the global BCH_N and BCH_K.
     Raises ValueError if parameters are invalid.
     """
-    if BCH_N <= 0 or BCH_K <= 0:
+    if n <= 0 or k <= 0:
         raise ValueError("BCH parameters must be positive integers")
-    if BCH_K >= BCH_N:
+    if k >= n:
         raise ValueError("Message length (k) must be less than codeword length (n)")
-    if not (BCH_N - 1).bit_length() <= 8:  # Max field size GF(2^m) where m <= 8
-        raise ValueError("Codeword length (n) too large for implementation") 
\ No newline at end of file
+    if not (n - 1).bit_length() <= 8:  # Max field size GF(2^m) where m <= 8
+        raise ValueError("Codeword length (n) too large for implementation")
+
+def validate_bch_decoder(decoder=BCH_DECODER):
+    """
+    Validate the name of the BCH decoding engine.
+    Raises ValueError if the engine is unknown.
+    """
+    if decoder not in ("galois", "lut"):
+        raise ValueError(f"Unknown BCH decoder '{decoder}', expected 'galois' or 'lut'")